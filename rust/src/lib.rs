@@ -1,58 +1,115 @@
+use numpy::{IntoPyArray, PyArray1, PyReadonlyArray1};
 use pyo3::prelude::*;
+use rand::{Rng, SeedableRng};
+use rand_chacha::ChaCha8Rng;
 use rayon::prelude::*;
 
+// Number of Monte Carlo iterations drawn from each RNG stream. Streams are tied to blocks of
+// iterations rather than to threads, so a given seed gives the same result on any number of cores.
+const ITERATIONS_PER_STREAM: usize = 1024;
+
 #[pyfunction]
-pub fn general_energy_transfer(
-    time: Vec<f64>,
-    radial_data: Vec<f64>,
+pub fn general_energy_transfer<'py>(
+    py: Python<'py>,
+    time: PyReadonlyArray1<'py, f64>,
+    radial_data: PyReadonlyArray1<'py, f64>,
     amp: f64,
     cr: f64,
     rad: f64,
     offset: f64,
-) -> PyResult<Vec<f64>> {
+) -> PyResult<Bound<'py, PyArray1<f64>>> {
+    let time = time.as_slice()?;
+    let radial_data = radial_data.as_slice()?;
     let n = radial_data.len() as f64;
 
-    let mut result = Vec::with_capacity(time.len());
-
-    for t in &time {
-        let mut sum = 0.0;
-        for r in &radial_data {
-            sum += (-t * (cr * r + rad)).exp();
+    let result = py.detach(|| {
+        let mut result = Vec::with_capacity(time.len());
+        for t in time {
+            let mut sum = 0.0;
+            for r in radial_data {
+                sum += (-t * (cr * r + rad)).exp();
+            }
+            result.push(amp / n * sum + offset);
         }
-        result.push(amp / n * sum + offset);
-    }
+        result
+    });
 
-    Ok(result)
+    Ok(result.into_pyarray(py))
 }
 
 #[pyfunction]
-pub fn general_energy_transfer_para(
-    time: Vec<f64>,
-    radial_data: Vec<f64>,
+pub fn general_energy_transfer_para<'py>(
+    py: Python<'py>,
+    time: PyReadonlyArray1<'py, f64>,
+    radial_data: PyReadonlyArray1<'py, f64>,
     amp: f64,
     cr: f64,
     rad: f64,
     offset: f64,
-) -> PyResult<Vec<f64>> {
+) -> PyResult<Bound<'py, PyArray1<f64>>> {
+    let time = time.as_slice()?;
+    let radial_data = radial_data.as_slice()?;
     let n = radial_data.len() as f64;
 
-    let result = time
-        .par_iter()
-        .map(|t| {
-            let sum: f64 = radial_data
-                .iter()
-                .map(|r| (-t * (cr * r + rad)).exp())
-                .sum();
-            amp / n * sum + offset
-        })
+    // the rayon workers do not touch Python objects, so the GIL is released while they run
+    let result: Vec<f64> = py.detach(|| {
+        time.par_iter()
+            .map(|t| {
+                let sum: f64 = radial_data
+                    .iter()
+                    .map(|r| (-t * (cr * r + rad)).exp())
+                    .sum();
+                amp / n * sum + offset
+            })
+            .collect()
+    });
+
+    Ok(result.into_pyarray(py))
+}
+
+#[pyfunction]
+pub fn sim_single_cross<'py>(
+    py: Python<'py>,
+    distances: PyReadonlyArray1<'py, f64>,
+    concentration: f64,
+    s: f64,
+    r0: f64,
+    iterations: usize,
+    seed: u64,
+) -> PyResult<Bound<'py, PyArray1<f64>>> {
+    let weights: Vec<f64> = distances
+        .as_slice()?
+        .iter()
+        .map(|r| (r0 / r).powf(s))
         .collect();
 
-    Ok(result)
+    let r_i = py.detach(|| {
+        let mut r_i = vec![0.0; iterations];
+        r_i.par_chunks_mut(ITERATIONS_PER_STREAM)
+            .enumerate()
+            .for_each(|(stream, block)| {
+                let mut rng = ChaCha8Rng::seed_from_u64(seed);
+                rng.set_stream(stream as u64);
+                for value in block.iter_mut() {
+                    let mut sum = 0.0;
+                    for w in &weights {
+                        if rng.random::<f64>() < concentration {
+                            sum += w;
+                        }
+                    }
+                    *value = sum;
+                }
+            });
+        r_i
+    });
+
+    Ok(r_i.into_pyarray(py))
 }
 
 #[pymodule]
 fn _pyet_mc(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(general_energy_transfer, m)?)?;
     m.add_function(wrap_pyfunction!(general_energy_transfer_para, m)?)?;
+    m.add_function(wrap_pyfunction!(sim_single_cross, m)?)?;
     Ok(())
 }
@@ -1,9 +1,18 @@
 """pyet-mc -- Python Energy Transfer Monte Carlo toolkit."""
 
-from .fitting import Optimiser, double_exp, general_energy_transfer
-from .plotting import Plot
-from .pyet_utils import Trace
-from .structure import Interaction, Structure
+import importlib
+
+# Public names are resolved on first access so that, for example, a fitting worker
+# importing Optimiser never loads pymatgen, plotly, pywebview, pandas or matplotlib.
+_lazy_imports = {
+    "Structure": ".structure",
+    "Interaction": ".structure",
+    "Optimiser": ".fitting",
+    "Trace": ".pyet_utils",
+    "Plot": ".plotting",
+    "general_energy_transfer": ".fitting",
+    "double_exp": ".fitting",
+}
 
 __all__ = [
     "Structure",
@@ -14,3 +23,23 @@ __all__ = [
     "general_energy_transfer",
     "double_exp",
 ]
+
+
+# Submodules are likewise imported on first access, so pyet_mc.fitting keeps working
+# after a bare "import pyet_mc".
+_lazy_submodules = {"structure", "fitting", "pyet_utils", "plotting"}
+
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        module = importlib.import_module(_lazy_imports[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    if name in _lazy_submodules:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
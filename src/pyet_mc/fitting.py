@@ -8,8 +8,7 @@ from typing import Callable, Dict, List, Optional, Union
 import numpy as np
 import scipy.optimize
 
-from .plotting import Plot
-from .pyet_utils import Trace, fit_logger
+from .pyet_utils import CompressedRadialData, LaplaceSurrogate, Trace, fit_logger
 
 try:
     from pyet_mc import _pyet_mc as pyrs
@@ -38,21 +37,20 @@ def _rust_energy_transfer(time, radial_data, dictionary):
 
     Values are extracted by position (insertion order), matching the contract
     of general_energy_transfer: [0] amp, [1] cr, [2] rad, [3] offset.
+    The Rust kernels take raw r_i, so compressed radial data is evaluated in Python.
+    The arrays are borrowed by the kernel without copying when they are already
+    contiguous float64 (e.g. memory-mapped cache entries), and the result is a NumPy array.
     """
-    time_list = time.tolist() if hasattr(time, "tolist") else list(time)
-    radial_list = (
-        radial_data.tolist() if hasattr(radial_data, "tolist") else list(radial_data)
-    )
+    if isinstance(radial_data, CompressedRadialData):
+        return general_energy_transfer(time, radial_data, dictionary)
     vals = list(map(float, dictionary.values()))
-    return np.array(
-        general_energy_transfer_rs(
-            time_list,
-            radial_list,
-            vals[0],
-            vals[1],
-            vals[2],
-            vals[3],
-        )
+    return general_energy_transfer_rs(
+        np.ascontiguousarray(time, dtype=np.float64),
+        np.ascontiguousarray(radial_data, dtype=np.float64),
+        vals[0],
+        vals[1],
+        vals[2],
+        vals[3],
     )
 
 
@@ -62,21 +60,20 @@ def _rust_energy_transfer_para(time, radial_data, dictionary):
 
     Values are extracted by position (insertion order), matching the contract
     of general_energy_transfer: [0] amp, [1] cr, [2] rad, [3] offset.
+    The Rust kernels take raw r_i, so compressed radial data is evaluated in Python.
+    The arrays are borrowed by the kernel without copying when they are already
+    contiguous float64 (e.g. memory-mapped cache entries), and the result is a NumPy array.
     """
-    time_list = time.tolist() if hasattr(time, "tolist") else list(time)
-    radial_list = (
-        radial_data.tolist() if hasattr(radial_data, "tolist") else list(radial_data)
-    )
+    if isinstance(radial_data, CompressedRadialData):
+        return general_energy_transfer(time, radial_data, dictionary)
     vals = list(map(float, dictionary.values()))
-    return np.array(
-        general_energy_transfer_para(
-            time_list,
-            radial_list,
-            vals[0],
-            vals[1],
-            vals[2],
-            vals[3],
-        )
+    return general_energy_transfer_para(
+        np.ascontiguousarray(time, dtype=np.float64),
+        np.ascontiguousarray(radial_data, dtype=np.float64),
+        vals[0],
+        vals[1],
+        vals[2],
+        vals[3],
     )
 
 
@@ -115,7 +112,7 @@ def general_energy_transfer(
 
     Parameters:
     time (np.ndarray): The time value used in the exponential calculation.
-    radial_data (np.ndarray): Array of radial distance components from Monte Carlo simulation.
+    radial_data (np.ndarray or CompressedRadialData): Array of radial distance components from Monte Carlo simulation, or its compressed form, in which case 1/N is replaced by the weight of each node.
     dictionary (dict): A dictionary containing the coefficients used in the calculation.
         The dictionary should have at least four values.
     The dictionary contains the parameters that define the expression:
@@ -130,12 +127,47 @@ def general_energy_transfer(
     np.ndarray: The result of the calculation as a numpy array.
     """
     vals = list(dictionary.values())
+    if isinstance(radial_data, CompressedRadialData):
+        exponentials = np.exp(
+            -1 * time[:, np.newaxis] * (vals[1] * radial_data.nodes + vals[2])
+        )
+        return vals[0] * (exponentials @ radial_data.weights) + vals[3]
     n = len(radial_data)
     exponentials = np.exp(-1 * time[:, np.newaxis] * (vals[1] * radial_data + vals[2]))
     result = vals[0] / n * np.sum(exponentials, axis=1) + vals[3]
     return result
 
 
+def laplace_energy_transfer(
+    time: np.ndarray, radial_data, dictionary: Dict
+) -> np.ndarray:
+    """
+    This function calculates the generalised energy transfer model for radial data that is described by its transform G(u) = <exp(-u * r_i)> rather than by a list of r_i, e.g. a ShellDistribution.
+
+    Parameters:
+    time (np.ndarray): The time value used in the exponential calculation.
+    radial_data: An object with a laplace(u) method returning <exp(-u * r_i)>.
+    dictionary (dict): A dictionary containing the coefficients used in the calculation.
+        The dictionary should have at least four values.
+    The dictionary contains the parameters that define the expression:
+        A * exp(-t * Rad) * G(Cr * t) + offset
+    which is identical to general_energy_transfer for G(u) = 1/N * sum_i(exp(-u * r_i)).
+    Values are accessed by position (insertion order):
+    [0] Amplitude
+    [1] Cross relaxation rate
+    [2] Radiative relaxation rate
+    [3] Offset
+
+    Returns:
+    np.ndarray: The result of the calculation as a numpy array.
+    """
+    vals = list(dictionary.values())
+    return (
+        vals[0] * np.exp(-vals[2] * time) * radial_data.laplace(vals[1] * time)
+        + vals[3]
+    )
+
+
 # class for handling the fitting, plotting & logging results
 class Optimiser:
     """
@@ -146,6 +178,9 @@ class Optimiser:
     variables (list): A list of variables for each trace.
     model (function): The model function used to describe the energy transfer process.
         Defaults to 'general_energy_transfer'. All models must accept (time, radial_data, dict).
+        'shell' selects laplace_energy_transfer for traces whose radial_data is a ShellDistribution.
+        'surrogate' tabulates G(u) = <exp(-u * r_i)> of each trace once (see LaplaceSurrogate) and evaluates laplace_energy_transfer by interpolation.
+    surrogates (list): The LaplaceSurrogate of each trace if model is 'surrogate', otherwise None.
     """
 
     def __init__(
@@ -154,9 +189,11 @@ class Optimiser:
         variables: List[str],
         auto_weights: bool = True,
         model: Union[str, Callable[..., np.ndarray]] = "default",
+        surrogate_tolerance: float = 1e-5,
     ):
         self.traces = traces  # list of numpy array containing experimental data
         self.variables = variables  # list of variables for each trace
+        self.surrogates = None
         if auto_weights:
             self.adjust_weights()
         if model == "default":
@@ -165,6 +202,14 @@ class Optimiser:
             self.model = _rust_energy_transfer_para
         elif model == "rs_single":
             self.model = _rust_energy_transfer
+        elif model == "shell":
+            self.model = laplace_energy_transfer
+        elif model == "surrogate":
+            self.model = laplace_energy_transfer
+            self.surrogates = [
+                LaplaceSurrogate(trace.radial_data, surrogate_tolerance)
+                for trace in self.traces
+            ]
         else:
             self.model = model
 
@@ -342,13 +387,17 @@ class Optimiser:
         for j in range(total_traces):
             keys = self.variables[j]
             temp_dict = {key: dictionary[key] for key in keys}
+            if self.surrogates is None:
+                radial_data = self.traces[j].radial_data
+            else:
+                radial_data = self.surrogates[j]
 
             rs += self.traces[j].weight * np.sum(
                 (
                     (
                         self.model(
                             self.traces[j].time,
-                            self.traces[j].radial_data,
+                            radial_data,
                             temp_dict,
                         )
                         - self.traces[j].trace
@@ -361,6 +410,8 @@ class Optimiser:
 
 
 if __name__ == "__main__":
+    from .plotting import Plot
+
     # testing
     cache_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "cache"))
     with open(
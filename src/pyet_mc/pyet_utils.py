@@ -1,22 +1,76 @@
+import collections
+import contextlib
 import datetime
+import functools
 import glob
+import hashlib
+import importlib.metadata
 import json
 import os
+import pathlib
 import random as rd
+import socket
+import sqlite3
 import sys
+import tempfile
+import time
+import warnings
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 
 import numpy as np
 import numpy.typing as npt
-import scipy.stats as stats
 
-cache_dir_path = os.path.join(os.path.dirname(__file__), "cache")
 
-if not os.path.exists(cache_dir_path):
-    os.makedirs(cache_dir_path)
+def _default_cache_dir() -> str:
+    """
+    Returns the default cache directory: PYET_CACHE_DIR if it is set, otherwise the cache directory inside the package, or the user cache directory (e.g. ~/.cache/pyet_mc) if the package is installed read-only.
+    """
+    if os.environ.get("PYET_CACHE_DIR"):
+        return os.path.abspath(os.path.expanduser(os.environ["PYET_CACHE_DIR"]))
+    package = os.path.dirname(os.path.abspath(__file__))
+    if os.access(package, os.W_OK):
+        return os.path.join(package, "cache")
+    user_cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(user_cache, "pyet_mc")
+
+
+# The local cache directory, which is created when first written to.
+cache_dir = _default_cache_dir()
+
+# Read-only cache directories (e.g. on a shared network file system) searched after the local one.
+cache_shared_dirs = [
+    os.path.abspath(os.path.expanduser(path))
+    for path in os.environ.get("PYET_CACHE_SHARED", "").split(os.pathsep)
+    if path
+]
 
-cache_dir = os.path.abspath(cache_dir_path)
+# Largest total size in bytes of the cached interaction components, or None for no limit.
+cache_max_bytes = (
+    int(os.environ["PYET_CACHE_MAX_BYTES"])
+    if os.environ.get("PYET_CACHE_MAX_BYTES")
+    else None
+)
+
+# Longest time in seconds to wait for another process simulating the same cache entry.
+cache_lock_timeout = 3600.0
+
+# Largest total size in bytes of the arrays that cache_reader keeps in memory, or 0 to disable.
+memory_cache_max_bytes = int(os.environ.get("PYET_MEMORY_CACHE_BYTES") or 256 * 1024**2)
+
+# Arrays returned by cache_reader, by lookup key, in order of last use.
+_memory_cache = collections.OrderedDict()
+
+_cache_stats = {
+    "hits": 0,
+    "memory_hits": 0,
+    "misses": 0,
+    "bytes_read": 0,
+    "bytes_written": 0,
+    "evictions": 0,
+}
 
 
 class Trace:
@@ -27,7 +81,7 @@ class Trace:
     trace (np.ndarray): The y-coordinates of the data points.
     name (str): The name of the trace.
     time (np.ndarray): The x-coordinates (time points) of the data points.
-    radial_data (np.ndarray): The radial data associated with the trace, this would be pre-calculated based on the concentration of the sample.
+    radial_data (np.ndarray): The radial data associated with the trace, this would be pre-calculated based on the concentration of the sample. A CompressedRadialData if compression was requested.
     """
 
     def __init__(
@@ -38,6 +92,7 @@ class Trace:
         radial_data: np.ndarray,
         weighting: int = 1,
         parser=False,
+        compression: Optional[float] = None,
     ):
         """
         The constructor for the Trace class.
@@ -48,12 +103,15 @@ class Trace:
         fname (str): The name of the trace.
         radial_data (np.ndarray): The radial data associated with the trace, this would be pre-calculated based on the concentration of the sample.
         parser (bool, optional): A flag indicating whether to parse the trace data. Defaults to False.
+        compression (float, optional): If set, the radial data is replaced by a CompressedRadialData with at most this approximation error (see compress_radial_data). Defaults to None (no compression).
         """
         self.weight = weighting
         self.trace = ydata
         self.name = fname
         self.time = xdata
         self.radial_data = radial_data
+        if compression is not None:
+            self.radial_data = compress_radial_data(radial_data, tolerance=compression)
         self.parser = "None"
         if parser:
             match parser:
@@ -84,87 +142,854 @@ class Trace:
         return np.unique(np.logspace(0, np.log10(max_index), num_samples, dtype=int))
 
 
-def cache_writer(r: np.ndarray, sourcefile: str, **params) -> None:
+class ShellDistribution:
+    """
+    The shell model description of the interaction components around a central ion. Same-species sites fall into discrete distance shells, and each shell is doped independently, so the distribution of r_i = sum (r0/r)^s is known exactly and no Monte Carlo iterations are needed.
+
+    Attributes:
+    radii (np.ndarray): The radius of each shell in Angstroms.
+    multiplicity (np.ndarray): The number of sites in each shell.
+    weights (np.ndarray): The interaction weight (r0/r)^s of a site in each shell.
+    concentration (float): The concentration of the dopant in % (e.g. 15 for 15%).
+    """
+
+    def __init__(
+        self,
+        radii: np.ndarray,
+        multiplicity: np.ndarray,
+        weights: np.ndarray,
+        concentration: float,
+    ):
+        """
+        The constructor for the ShellDistribution class.
+
+        Parameters:
+        radii (np.ndarray): The radius of each shell in Angstroms.
+        multiplicity (np.ndarray): The number of sites in each shell.
+        weights (np.ndarray): The interaction weight (r0/r)^s of a site in each shell.
+        concentration (float): The concentration of the dopant in % (e.g. 15 for 15%).
+        """
+        self.radii = np.asarray(radii, dtype=np.float64)
+        self.multiplicity = np.asarray(multiplicity, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.concentration = concentration
+
+    def __len__(self) -> int:
+        return len(self.radii)
+
+    def mean(self) -> float:
+        """
+        Returns the mean interaction component, c * sum(n_shell * w_shell).
+        """
+        return self.concentration / 100 * np.dot(self.multiplicity, self.weights)
+
+    def laplace(self, u: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the ensemble average <exp(-u * r_i)> exactly.
+
+        Each site in a shell is doped with probability c, so the average is the product over shells of (1 - c + c * exp(-u * w_shell))^n_shell. The product is accumulated as a sum of logarithms to stay accurate for large shells.
+
+        Parameters:
+        u (np.ndarray): The values at which to evaluate the transform, e.g. Cr * t.
+
+        Returns:
+        np.ndarray: <exp(-u * r_i)> for each value of u.
+        """
+        fraction = self.concentration / 100
+        exponent = np.multiply.outer(np.asarray(u, dtype=np.float64), self.weights)
+        return np.exp(np.log1p(fraction * np.expm1(-exponent)) @ self.multiplicity)
+
+
+class CompressedRadialData:
+    """
+    A weighted set of nodes standing in for a large array of interaction components r_i. The energy transfer models only depend on the distribution of r_i, so a few hundred weighted nodes reproduce the decay of tens of thousands of r_i at a fraction of the cost. Created by compress_radial_data.
+
+    Attributes:
+    nodes (np.ndarray): The node values of r_i.
+    weights (np.ndarray): The fraction of the r_i represented by each node, summing to 1.
+    error (float): The largest difference between <exp(-u * r_i)> of the nodes and of the full set over the checked u grid.
+    """
+
+    def __init__(self, nodes: np.ndarray, weights: np.ndarray, error: float):
+        """
+        The constructor for the CompressedRadialData class.
+
+        Parameters:
+        nodes (np.ndarray): The node values of r_i.
+        weights (np.ndarray): The fraction of the r_i represented by each node, summing to 1.
+        error (float): The approximation error of the compression.
+        """
+        self.nodes = np.asarray(nodes, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.error = error
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def mean(self) -> float:
+        """
+        Returns the mean interaction component, which is preserved exactly by the compression.
+        """
+        return float(np.dot(self.weights, self.nodes))
+
+    def laplace(self, u: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the weighted average <exp(-u * r_i)> over the nodes.
+
+        Parameters:
+        u (np.ndarray): The values at which to evaluate the transform, e.g. Cr * t.
+
+        Returns:
+        np.ndarray: <exp(-u * r_i)> for each value of u.
+        """
+        exponent = np.multiply.outer(np.asarray(u, dtype=np.float64), self.nodes)
+        return np.exp(-exponent) @ self.weights
+
+
+def compress_radial_data(
+    r_i: np.ndarray, tolerance: float = 1e-4, u_grid: Optional[np.ndarray] = None
+) -> CompressedRadialData:
     """
-    Writes data to a file in the cache directory.
+    Compresses an array of interaction components r_i into weighted nodes on log-spaced bins.
 
-    This function constructs a filename from the provided simulation parameters and the current timestamp, and then writes the computed data to a file with that name in the directory.
-    The data is written in JSON format, with the 'sourcefile', 'date', and 'r_components' fields containing the source file name, the current date and time, and the interaction data, respectively.
+    The r_i are binned on bins of relative width w, [a, a * (1 + w)], and each bin is replaced by the mean of its r_i, so the mean of r_i is preserved exactly. Replacing a bin by its mean changes <exp(-u * r_i)> by at most (u * a * w)^2 / 8 * exp(-u * a) <= exp(-2) / 2 * w^2 for any u, so choosing w = sqrt(2 * exp(2) * tolerance) bounds the error on every normalised decay by tolerance, independently of the number of r_i. Exact zeros (no dopant within the radius) are kept as their own node. The achieved error is also measured against the full set over a grid of u = Cr * t.
+
+    Args:
+        r_i (np.ndarray): The interaction components, e.g. from sim_single_cross.
+        tolerance (float, optional): The largest acceptable error on a normalised decay. Defaults to 1e-4.
+        u_grid (np.ndarray, optional): The u values at which the error is measured. Defaults to 64 log-spaced values from 1e-3 to 1e3 over the mean of r_i.
+
+    Returns:
+        CompressedRadialData: The nodes, their weights and the measured error.
+
+    Raises:
+        ValueError: If any r_i is negative.
+    """
+    r_i = np.asarray(r_i, dtype=np.float64).ravel()
+    if np.any(r_i < 0):
+        raise ValueError("Interaction components must be non-negative")
+    width = np.sqrt(2 * np.exp(2) * tolerance)
+
+    positive = r_i[r_i > 0]
+    nodes, weights = [], []
+    if len(positive) < len(r_i):
+        nodes.append(np.zeros(1))
+        weights.append(np.array([len(r_i) - len(positive)]))
+    if len(positive):
+        log_r = np.log(positive)
+        bins = ((log_r - log_r.min()) / np.log1p(width)).astype(np.intp)
+        counts = np.bincount(bins)
+        sums = np.bincount(bins, weights=positive)
+        occupied = counts > 0
+        nodes.append(sums[occupied] / counts[occupied])
+        weights.append(counts[occupied])
+    compressed = CompressedRadialData(
+        np.concatenate(nodes), np.concatenate(weights) / len(r_i), 0.0
+    )
+
+    if u_grid is None:
+        mean = r_i.mean()
+        u_grid = np.logspace(-3, 3, 64) / (mean if mean > 0 else 1.0)
+    u_grid = np.asarray(u_grid, dtype=np.float64)
+    exact = np.array([np.exp(-u * r_i).mean() for u in u_grid])
+    compressed.error = float(np.max(np.abs(compressed.laplace(u_grid) - exact)))
+    return compressed
+
+
+class LaplaceSurrogate:
+    """
+    A tabulated surrogate of G(u) = <exp(-u * r_i)> for one set of radial data. The energy transfer model factors as A * exp(-t * Rad) * G(Cr * t) + offset, so once G is tabulated every evaluation of the model costs O(len(time)) instead of O(len(time) * len(r_i)).
+
+    G is tabulated on a grid of u that starts at G(0) = 1 and is interpolated linearly. For r_i >= 0, G is convex and nonincreasing, which gives a strict bound on the interpolation error from the tabulated values alone. On each interval the true G lies below the chord and above the tangents at both ends, and by convexity the secants of the neighbouring intervals are bounds on those tangents' slopes. The largest gap between the chord and these lines, or the drop G[k] - G[k+1] if that is smaller, bounds the error. Intervals are halved until the bound is within the tolerance. Beyond the last grid point G is held constant, with an error of at most G(u_max) minus the exact limit of G as u goes to infinity (the fraction of r_i that are zero). The grid is extended until that is within the tolerance too. Only the floating point error of evaluating G, around 1e-16, is not covered.
+
+    Attributes:
+    u (np.ndarray): The tabulated values of u, starting at 0.
+    G (np.ndarray): G(u) at each tabulated value.
+    tolerance (float): The interpolation tolerance.
+    error (float): The bound on the interpolation error of the final grid, including the tail beyond the last grid point.
+    """
+
+    def __init__(self, radial_data, tolerance: float = 1e-5, max_points: int = 100000):
+        """
+        The constructor for the LaplaceSurrogate class.
+
+        Parameters:
+        radial_data (np.ndarray, CompressedRadialData or ShellDistribution): The radial data to tabulate, with r_i >= 0. CompressedRadialData and ShellDistribution are evaluated through their laplace(u) method.
+        tolerance (float, optional): The bound on the interpolation error of G. Defaults to 1e-5.
+        max_points (int, optional): The largest number of grid points. If the tolerance cannot be reached within it (e.g. because it is below the floating point error of G), refinement stops and a RuntimeWarning is issued. Defaults to 100000.
+        """
+        if isinstance(radial_data, (CompressedRadialData, ShellDistribution)):
+            exact = radial_data.laplace
+            mean = radial_data.mean()
+        else:
+            r_i = np.asarray(radial_data, dtype=np.float64)
+
+            def exact(u):
+                return _empirical_laplace(r_i, u)
+
+            mean = r_i.mean()
+        scale = mean if mean > 0 else 1.0
+        limit = _laplace_limit(radial_data)
+        self.tolerance = tolerance
+
+        # extend the grid until holding G constant beyond it is within tolerance
+        u_max = 1e3 / scale
+        for _ in range(60):
+            tail = float(exact(u_max)) - limit
+            if tail <= tolerance:
+                break
+            u_max *= 2
+        u = np.concatenate(
+            [[0.0], np.logspace(np.log10(1e-6 / scale), np.log10(u_max), 64)]
+        )
+        G = np.asarray(exact(u), dtype=np.float64)
+
+        while True:
+            bound = _interpolation_bound(u, G)
+            coarse = ~(bound <= tolerance)
+            if not coarse.any():
+                break
+            if len(u) + np.count_nonzero(coarse) > max_points:
+                warnings.warn(
+                    f"LaplaceSurrogate stopped refining at {len(u)} points with an "
+                    f"error bound of {np.nanmax(bound):.2e}, above the tolerance "
+                    f"of {tolerance:.2e}. Increase max_points or the tolerance.",
+                    RuntimeWarning,
+                )
+                break
+            left, right = u[:-1][coarse], u[1:][coarse]
+            midpoints = np.where(left > 0, np.sqrt(left * right), right / 2)
+            G_mid = np.asarray(exact(midpoints), dtype=np.float64)
+            u = np.insert(u, np.flatnonzero(coarse) + 1, midpoints)
+            G = np.insert(G, np.flatnonzero(coarse) + 1, G_mid)
+        if tail > tolerance:
+            warnings.warn(
+                f"LaplaceSurrogate could not extend the grid far enough for G to "
+                f"converge to its limit; the error beyond u = {u_max:.2e} is up to "
+                f"{tail:.2e}.",
+                RuntimeWarning,
+            )
+        self.error = max(float(np.nanmax(bound, initial=0.0)), max(tail, 0.0))
+        self.u = u
+        self.G = G
+
+    def __len__(self) -> int:
+        return len(self.u)
+
+    def laplace(self, u: np.ndarray) -> np.ndarray:
+        """
+        Evaluates the surrogate of <exp(-u * r_i)>.
+
+        Parameters:
+        u (np.ndarray): The values at which to evaluate the transform, e.g. Cr * t.
+
+        Returns:
+        np.ndarray: The interpolated G(u) for each value of u.
+        """
+        u = np.asarray(u, dtype=np.float64)
+        return np.interp(np.maximum(u, 0), self.u, self.G)
+
+
+def _interpolation_bound(u: np.ndarray, G: np.ndarray) -> np.ndarray:
+    """
+    Returns a bound on the error of linear interpolation of a convex, nonincreasing G on each interval of the grid u (see LaplaceSurrogate).
+    """
+    width = np.diff(u)
+    drop = G[:-1] - G[1:]
+    slope = -drop / width
+    # by convexity the tangent slope at the left end is at least the previous secant's,
+    # and at the right end at most the next secant's; the end intervals lack one of them
+    below = np.concatenate([[-np.inf], slope[:-1]])
+    above = np.concatenate([slope[1:], [np.inf]])
+    left_gap = np.maximum(slope - below, 0)
+    right_gap = np.maximum(above - slope, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tangent = left_gap * right_gap * width / (left_gap + right_gap)
+    tangent = np.where(np.isfinite(tangent), tangent, np.inf)
+    return np.minimum(tangent, np.maximum(drop, 0))
+
+
+def _laplace_limit(radial_data) -> float:
+    """
+    Returns the limit of <exp(-u * r_i)> as u goes to infinity, the fraction of r_i that are zero.
+    """
+    if isinstance(radial_data, ShellDistribution):
+        fraction = radial_data.concentration / 100
+        sites = radial_data.multiplicity[radial_data.weights > 0].sum()
+        return float((1 - fraction) ** sites)
+    if isinstance(radial_data, CompressedRadialData):
+        return float(radial_data.weights[radial_data.nodes == 0].sum())
+    return float(np.mean(np.asarray(radial_data) == 0))
+
+
+def _empirical_laplace(r_i: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """
+    Evaluates <exp(-u * r_i)> over an array of r_i, a few values of u at a time to bound memory use.
+    """
+    u = np.asarray(u, dtype=np.float64)
+    flat = u.reshape(-1)
+    result = np.empty(len(flat))
+    step = max(1, 2**22 // max(len(r_i), 1))
+    for start in range(0, len(flat), step):
+        block = flat[start : start + step]
+        result[start : start + step] = np.exp(-np.multiply.outer(block, r_i)).mean(
+            axis=1
+        )
+    return result.reshape(u.shape)
+
+
+class RunningStats:
+    """
+    Running statistics of a stream of interaction components. The mean and variance are merged block by block (Chan et al.'s parallel update), so they are numerically stable and never need the full stream in memory.
+
+    Attributes:
+    count (int): The number of values seen so far.
+    mean (float): The running mean.
+    variance (float): The running (sample) variance.
+    bin_edges (np.ndarray): The edges of the histogram bins.
+    histogram (np.ndarray): The running count of values in each bin.
+    """
+
+    def __init__(self, bin_edges: np.ndarray):
+        """
+        The constructor for the RunningStats class.
+
+        Parameters:
+        bin_edges (np.ndarray): The edges of the histogram bins. Values outside the edges are counted towards the mean and variance but not the histogram.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.bin_edges = np.asarray(bin_edges, dtype=np.float64)
+        self.histogram = np.zeros(len(self.bin_edges) - 1, dtype=np.int64)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Adds a block of values to the running statistics.
+
+        Parameters:
+        values (np.ndarray): The new values.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n == 0:
+            return
+        block_mean = values.mean()
+        block_m2 = np.sum((values - block_mean) ** 2)
+        delta = block_mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self._m2 += block_m2 + delta**2 * self.count * n / total
+        self.count = total
+        self.histogram += np.histogram(values, self.bin_edges)[0]
+
+
+def _atomic_write(path: str, write) -> None:
+    """
+    Writes a file under a temporary name in the same directory and then moves it into place, so a concurrent reader never sees a partially written file.
+
+    Args:
+        path (str): The final path of the file.
+        write (Callable): A function that writes the contents to an open binary file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            write(fp)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _write_sidecar(path: str, metadata: dict) -> None:
+    _atomic_write(path, lambda fp: fp.write(json.dumps(metadata).encode()))
+
+
+def _migrate_legacy_entry(json_path: str, metadata: dict) -> np.ndarray:
+    """
+    Converts a cache entry that stores r_components inside its JSON file to a .npy payload with a metadata-only sidecar, and returns the payload.
+
+    If the cache directory cannot be written to, the legacy entry is left in place and the components are returned from memory.
+    """
+    data = np.asarray(metadata.pop("r_components"), dtype=np.float64)
+    npy_path = os.path.splitext(json_path)[0] + ".npy"
+    try:
+        _atomic_write(npy_path, lambda fp: np.save(fp, data))
+        _write_sidecar(json_path, metadata)
+    except OSError as e:
+        print(f"Could not migrate legacy cache entry: {e}")
+        return data
+    return _load_payload(npy_path)
+
+
+def _load_payload(npy_path: str) -> np.ndarray:
+    """
+    Loads a .npy cache payload as a read-only memory map, so the components are only read from disk as they are used.
+    """
+    try:
+        return np.load(npy_path, mmap_mode="r")
+    except ValueError:
+        # empty arrays cannot be memory mapped
+        return np.load(npy_path)
+
+
+def cache_writer(
+    r: np.ndarray,
+    sourcefile: str,
+    key: Optional[str] = None,
+    supersedes: Optional[str] = None,
+    **params,
+) -> None:
+    """
+    Writes data to a file in the local cache directory (cache_dir), creating the directory if needed.
+
+    This function constructs a filename from the provided simulation parameters and the current timestamp.
+    The data is written as a binary .npy payload, alongside a small JSON sidecar with the same name holding the simulation parameters and the 'sourcefile' and 'date' fields (the source file name and the current date and time).
+    Both files are written to a temporary name and moved into place, and the sidecar is written last, so a reader never sees an incomplete entry. The entry is then added to the manifest index of the cache directory.
+    If cache_max_bytes is set, the least recently used entries are then evicted until the cache fits (see cache_prune).
 
     Args:
         r (np.ndarray): The data to write to the file.
         sourcefile (str): The source file from which the data was computed from.
+        key (str, optional): The content-addressed key of the simulation (see cache_key), which is stored with the entry. Defaults to None.
+        supersedes (str, optional): The file name of an entry that the new entry extends (see cache_partial_reader), which is removed once the new entry is in place. Defaults to None.
         **params (Dict[str, Any]): The parameters to construct the filename from.
 
     Raises:
-        FileNotFoundError: If the directory does not exist.
-        JSONDecodeError: If the data cannot be serialized to JSON.
+        OSError: If the cache directory cannot be created or written to.
+        TypeError: If the parameters cannot be serialized to JSON.
     """
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
     file_name = f"{params['process']}_{params['radius']}_{params['concentration']}_{params['interaction_type']}_{params['iterations']}_intrinsic_{params['intrinsic']}_{timestamp}"
     file_name = file_name.replace(".", "pt")
     temp = {}
     temp["sourcefile"] = sourcefile
     temp["date"] = datetime.now().isoformat()
-    temp["r_components"] = r.tolist()
+    if key is not None:
+        temp["key"] = key
     dictionary = params | temp
-    with open(f"{cache_dir}/{file_name}.json", "w") as fp:
-        json.dump(dictionary, fp)
+    data = np.ascontiguousarray(r, dtype=np.float64)
+    os.makedirs(cache_dir, exist_ok=True)
+    _atomic_write(f"{cache_dir}/{file_name}.npy", lambda fp: np.save(fp, data))
+    _write_sidecar(f"{cache_dir}/{file_name}.json", dictionary)
+    conn = _index_connect()
+    try:
+        with conn:
+            _cache_stats["bytes_written"] += _index_entry(conn, file_name, dictionary)
+            if supersedes is not None:
+                _remove_entry(conn, supersedes)
+    finally:
+        conn.close()
+    if cache_max_bytes is not None:
+        cache_prune(max_bytes=cache_max_bytes, keep=[file_name])
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Returns the installed version of pyet_mc, or 'unknown' when running from a source tree that is not installed.
+    """
+    try:
+        return importlib.metadata.version("pyet_mc")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
 
 
-def cache_reader(sourcefile: str, **params) -> np.ndarray:
+def cache_key(**inputs) -> str:
     """
-    Reads cached data from a file in the specified directory.
+    Returns a content-addressed cache key: the SHA-256 hash of a canonical JSON encoding of the simulation inputs and the pyet_mc version.
 
-    This function constructs a filename from the provided parameters, and then tries to find a file with that name in the directory.
-    If it finds a file with that name, it reads the data from the file and returns it as a numpy array.
-    If it does not find a file with that name, it raises an exception.
+    Two simulations share a key only if every input that affects their result is identical, regardless of file names or the machine they ran on.
 
     Args:
-        sourcefile (str): The source file used to compute the interaction data from.
-        **params (Dict[str, Any]): The parameters to construct the filename from, these are the parameters used in the computation of the interaction data.
+        **inputs (Dict[str, Any]): The simulation inputs, e.g. the hash of the CIF file, the centre ion, radius, concentration and distance exponent. Values must be JSON serialisable.
 
     Returns:
-        np.ndarray: The data read from the file, as a numpy array.
-
-    Raises:
-        FileNotFoundError: If the directory or file does not exist.
-        JSONDecodeError: If the file does not contain valid JSON.
+        str: The hexadecimal key.
     """
+    record = inputs | {"version": code_version()}
+    encoded = json.dumps(record, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+_INDEX_NAME = "index.sqlite"
+_INDEX_VERSION = 2
+_FILENAME_KEYS = (
+    "process",
+    "radius",
+    "concentration",
+    "interaction_type",
+    "iterations",
+    "intrinsic",
+)
 
-    directory = cache_dir
 
-    vmat = [
+def _cache_key(params: dict) -> str:
+    """
+    Returns the normalised lookup key of a set of simulation parameters: the parameters that make up a cache filename, except the number of iterations, which is indexed separately.
+    """
+    parts = [
         params["process"],
         str(params["radius"]),
         str(params["concentration"]),
         str(params["interaction_type"]),
-        str(params["iterations"]),
         "intrinsic",
         str(params["intrinsic"]),
     ]
-    for i in range(len(vmat)):
-        vmat[i] = vmat[i].replace(".", "pt")
-    data = None
+    return "_".join(parts).replace(".", "pt")
+
+
+def _index_entry(
+    conn: sqlite3.Connection,
+    name: str,
+    metadata: dict,
+    accessed: Optional[float] = None,
+    directory: Optional[str] = None,
+) -> int:
+    """
+    Adds (or replaces) the index row of the cache entry with the given file name (without extension) and sidecar metadata, and returns the size of the entry in bytes. The entry is marked as last used at accessed (seconds since the epoch), which defaults to now. The entry files are looked up in directory, which defaults to cache_dir.
+    """
+    extra = {
+        k: v
+        for k, v in metadata.items()
+        if k not in _FILENAME_KEYS + ("sourcefile", "date", "r_components", "key")
+    }
+    size = 0
+    for extension in (".json", ".npy"):
+        path = os.path.join(directory or cache_dir, name + extension)
+        if os.path.exists(path):
+            size += os.path.getsize(path)
+    conn.execute(
+        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            name,
+            metadata.get("key"),
+            _cache_key(metadata),
+            int(metadata["iterations"]),
+            metadata["sourcefile"],
+            json.dumps(extra, sort_keys=True),
+            "json" if "r_components" in metadata else "npy",
+            size,
+            metadata.get("date", ""),
+            time.time() if accessed is None else accessed,
+        ),
+    )
+    return size
+
+
+def _index_connect(
+    directory: Optional[str] = None, read_only: bool = False
+) -> sqlite3.Connection:
+    """
+    Opens the SQLite manifest of a cache directory (cache_dir by default), which maps the lookup key of every entry to its file, so a lookup is a single indexed query instead of a scan of every sidecar.
+
+    If the manifest does not exist, or was written by a version with a different layout, it is rebuilt from the sidecars in the directory. The manifest of a read-only (shared) directory is opened without writing to it; if it is not usable, the directory is indexed in memory instead. Nothing is created on disk in read-only mode, so a directory that does not exist gives an empty index.
+    """
+    directory = cache_dir if directory is None else directory
+    path = os.path.join(directory, _INDEX_NAME)
+    if read_only:
+        rebuild = os.path.isdir(directory)
+        try:
+            conn = sqlite3.connect(
+                f"{pathlib.Path(path).as_uri()}?mode=ro", uri=True, timeout=30
+            )
+            if conn.execute("PRAGMA user_version").fetchone()[0] == _INDEX_VERSION:
+                return conn
+            conn.close()
+        except sqlite3.Error:
+            pass
+        conn = sqlite3.connect(":memory:")
+    else:
+        os.makedirs(directory, exist_ok=True)
+        rebuild = not os.path.exists(path)
+        conn = sqlite3.connect(path, timeout=30)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _INDEX_VERSION:
+            rebuild = True
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS entries")
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "file TEXT PRIMARY KEY, hash TEXT, key TEXT, iterations INTEGER, "
+            "sourcefile TEXT, extra TEXT, format TEXT, bytes INTEGER, created TEXT, "
+            "accessed REAL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_lookup "
+            "ON entries (key, sourcefile, iterations)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_hash ON entries (hash, iterations)"
+        )
+        conn.execute(f"PRAGMA user_version = {_INDEX_VERSION}")
+    if rebuild:
+        with conn:
+            for filename in os.listdir(directory):
+                name, extension = os.path.splitext(filename)
+                if extension != ".json":
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    with open(path) as json_file:
+                        metadata = json.load(json_file)
+                    _index_entry(
+                        conn, name, metadata, os.path.getmtime(path), directory
+                    )
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Skipping unreadable cache entry {filename}: {e}")
+    return conn
+
+
+def _matching_entries(
+    conn: sqlite3.Connection,
+    sourcefile: str,
+    key: Optional[str],
+    params: dict,
+    condition: str,
+    order: str,
+) -> list:
+    """
+    Returns the (file, extra, format, bytes, iterations) rows of the index that match the given parameters, with an iteration count satisfying condition (e.g. '>= ?'), in the given order. Non-filename parameters (e.g. seed) must equal the stored values.
+    """
+    if key is None:
+        rows = conn.execute(
+            "SELECT file, extra, format, bytes, iterations FROM entries "
+            f"WHERE key = ? AND sourcefile = ? AND iterations {condition} "
+            f"ORDER BY {order}",
+            (_cache_key(params), sourcefile, int(params["iterations"])),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            "SELECT file, extra, format, bytes, iterations FROM entries "
+            f"WHERE hash = ? AND iterations {condition} ORDER BY {order}",
+            (key, int(params["iterations"])),
+        ).fetchall()
+    metadata = {k: v for k, v in params.items() if k not in _FILENAME_KEYS}
+    matches = []
+    for name, extra, format, size, iterations in rows:
+        extra = json.loads(extra)
+        if all(extra.get(k) == v for k, v in metadata.items()):
+            matches.append((name, extra, format, size, iterations))
+    return matches
+
+
+def _open_entry(
+    conn: sqlite3.Connection, name: str, format: str, read_only: bool = False
+) -> np.ndarray:
+    """
+    Loads the components of an indexed entry, migrating legacy JSON entries, and marks the entry as used. Rows whose files have disappeared are removed from the index and raise FileNotFoundError. If read_only is True, neither the entry nor the index is changed.
+    """
+    json_path = os.path.join(cache_dir, f"{name}.json")
+    try:
+        if format == "json":
+            with open(json_path) as json_file:
+                metadata = json.load(json_file)
+            if read_only:
+                return np.asarray(metadata["r_components"], dtype=np.float64)
+            data = _migrate_legacy_entry(json_path, metadata)
+            with conn:
+                conn.execute(
+                    "UPDATE entries SET format = 'npy' WHERE file = ?", (name,)
+                )
+        else:
+            data = _load_payload(os.path.join(cache_dir, f"{name}.npy"))
+    except FileNotFoundError:
+        # the entry was deleted behind the index's back
+        if not read_only:
+            with conn:
+                conn.execute("DELETE FROM entries WHERE file = ?", (name,))
+        raise
+    if read_only:
+        return data
+    with conn:
+        conn.execute(
+            "UPDATE entries SET accessed = ? WHERE file = ?", (time.time(), name)
+        )
+    return data
+
+
+def _promote_entry(directory: str, name: str, format: str) -> Tuple[np.ndarray, str]:
+    """
+    Copies an entry from a shared cache directory to the local cache directory, adds it to the local index and returns the local copy and the directory it is in. If the entry cannot be copied (e.g. the local directory is full), the shared copy and directory are returned instead.
+    """
+    with open(os.path.join(directory, f"{name}.json")) as json_file:
+        metadata = json.load(json_file)
+    if format == "json":
+        data = np.asarray(metadata.pop("r_components"), dtype=np.float64)
+    else:
+        data = _load_payload(os.path.join(directory, f"{name}.npy"))
+    npy_path = os.path.join(cache_dir, f"{name}.npy")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _atomic_write(npy_path, lambda fp: np.save(fp, data))
+        _write_sidecar(os.path.join(cache_dir, f"{name}.json"), metadata)
+        conn = _index_connect()
+        try:
+            with conn:
+                _cache_stats["bytes_written"] += _index_entry(conn, name, metadata)
+        finally:
+            conn.close()
+    except OSError as e:
+        print(f"Could not copy shared cache entry to {cache_dir}: {e}")
+        return data, directory
+    print(f"copied cache entry {name} from {directory}")
+    if cache_max_bytes is not None:
+        cache_prune(max_bytes=cache_max_bytes, keep=[name])
+    return _load_payload(npy_path), cache_dir
+
+
+def _find_entry(
+    sourcefile: str,
+    key: Optional[str],
+    params: dict,
+    condition: str,
+    order: str,
+) -> Optional[tuple]:
+    """
+    Looks an entry up in the local cache directory and then in each shared cache directory, as for _matching_entries, and returns the (data, extra, file, bytes, iterations, directory) of the first match, or None. Entries found in a shared directory are promoted to the local one, and directory is where the returned data is read from. Directories that do not exist are skipped, and a local directory that cannot be written to is read without changing it.
+    """
+    for directory in [cache_dir, *cache_shared_dirs]:
+        if not os.path.isdir(directory):
+            continue
+        shared = directory != cache_dir
+        read_only = shared or not os.access(directory, os.W_OK)
+        conn = _index_connect(directory, read_only=read_only)
+        try:
+            rows = _matching_entries(conn, sourcefile, key, params, condition, order)
+            for name, extra, format, size, iterations in rows:
+                try:
+                    if shared:
+                        data, location = _promote_entry(directory, name, format)
+                    else:
+                        data = _open_entry(conn, name, format, read_only)
+                        location = directory
+                except FileNotFoundError:
+                    continue
+                return data, extra, name, size, iterations, location
+        finally:
+            conn.close()
+    return None
+
+
+def _memory_key(sourcefile: str, key: Optional[str], params: dict) -> str:
+    """
+    Returns the key of a cache_reader request in the in-memory cache: the canonical simulation key, the number of iterations and any parameters that must match exactly (e.g. seed).
+    """
+    metadata = {k: v for k, v in params.items() if k not in _FILENAME_KEYS}
+    lookup = [sourcefile, _cache_key(params)] if key is None else key
+    return json.dumps(
+        [lookup, int(params["iterations"]), metadata], sort_keys=True, default=str
+    )
+
+
+def _memory_get(memory_key: str) -> Optional[np.ndarray]:
+    """
+    Returns the array held in memory for a request, or None. Arrays whose entry has since been deleted from disk are dropped.
+    """
+    if memory_key not in _memory_cache:
+        return None
+    data, path = _memory_cache[memory_key]
+    if not os.path.exists(path):
+        del _memory_cache[memory_key]
+        return None
+    _memory_cache.move_to_end(memory_key)
+    return data
+
+
+def _memory_trim(max_bytes: int) -> None:
+    """
+    Evicts the least recently used arrays from memory until their total size is at most max_bytes.
+    """
+    total = sum(array.nbytes for array, _ in _memory_cache.values())
+    while total > max_bytes:
+        _, (array, _) = _memory_cache.popitem(last=False)
+        total -= array.nbytes
+
+
+def _memory_evict(path: Optional[str] = None) -> None:
+    """
+    Drops the arrays held in memory for the entry with the given sidecar path, or every array if path is None, so that their memory maps are released before the files are deleted.
+    """
+    if path is None:
+        _memory_cache.clear()
+        return
+    for memory_key, (_, entry_path) in list(_memory_cache.items()):
+        if entry_path == path:
+            del _memory_cache[memory_key]
+
+
+def _memory_put(memory_key: str, data: np.ndarray, path: str) -> None:
+    """
+    Keeps a read-only array in memory, within memory_cache_max_bytes.
+    """
+    if data.nbytes > memory_cache_max_bytes:
+        return
+    _memory_cache[memory_key] = (data, path)
+    _memory_cache.move_to_end(memory_key)
+    _memory_trim(memory_cache_max_bytes)
+
+
+def cache_reader(sourcefile: str, key: Optional[str] = None, **params) -> np.ndarray:
+    """
+    Reads cached data from a file in the specified directory.
+
+    This function looks the provided parameters up in the manifest index of the cache directory (rebuilding it from the directory if it is missing).
+    If there is no match, the shared cache directories (cache_shared_dirs) are searched in order, and an entry found there is copied to the local cache directory, so later reads are local.
+    If a content-addressed key (see cache_key) is given, entries are matched on the key and the number of iterations alone, so the source file name is not needed and entries written on other machines are found.
+    Monte Carlo iterations are independent, so any entry with at least the requested number of iterations can serve the request: the smallest such entry is used, and its first 'iterations' components are returned. For seeded runs the first iterations of a longer run are identical to a shorter run with the same seed.
+    If it finds a matching entry, it returns the data as a read-only numpy array memory-mapped from the .npy payload.
+    Returned arrays are also kept in a bounded in-memory cache (memory_cache_max_bytes, least recently used first out), so repeating a request returns the same array without touching the index.
+    Entries written by older versions, which store the data inside the JSON file, are converted to the binary format the first time they are read.
+    If it does not find a matching entry, it returns None.
+
+    Args:
+        sourcefile (str): The source file used to compute the interaction data from.
+        key (str, optional): The content-addressed key of the simulation. Defaults to None (match on the parameters and source file).
+        **params (Dict[str, Any]): The parameters to construct the filename from, these are the parameters used in the computation of the interaction data. Any parameter that is not part of the filename (e.g. seed) must match the value stored in the file.
+
+    Returns:
+        np.ndarray: The data read from the file, as a read-only numpy array.
+
+    Raises:
+        FileNotFoundError: If the directory or file does not exist.
+        JSONDecodeError: If the file does not contain valid JSON.
+    """
+    iterations = int(params["iterations"])
+    memory_key = _memory_key(sourcefile, key, params)
+    data = _memory_get(memory_key)
+    if data is not None:
+        _cache_stats["hits"] += 1
+        _cache_stats["memory_hits"] += 1
+        print("file found in cache, returning interaction components")
+        return data
     try:
-        for filename in os.listdir(directory):
-            tempTuple = os.path.splitext(filename)
-            filename = tempTuple[0]
-            # Remove the timestamp from the filename
-            filename_without_timestamp = "_".join(filename.split("_")[:-1])
-            temp = filename_without_timestamp.split("_")
-
-            with open(f"{directory}/{filename}.json") as json_file:
-                dict = json.load(json_file)
-                if vmat == temp and dict["sourcefile"] == sourcefile:
-                    print("file found in cache, returning interaction components")
-                    data = np.asarray(dict["r_components"])
-                    break
-        if data is None:
+        entry = _find_entry(
+            sourcefile, key, params, ">= ?", "iterations ASC, created DESC"
+        )
+        if entry is None:
+            _cache_stats["misses"] += 1
             raise FileNotFoundError(
                 "No cached file found matching the given parameters. "
                 "Check your inputs or consider running a simulation with these parameters."
             )
+        data, _, name, size, stored_iterations, directory = entry
+        _cache_stats["hits"] += 1
+        _cache_stats["bytes_read"] += size
+        if stored_iterations > iterations:
+            data = data[:iterations]
+            print(
+                f"file found in cache, returning the first {iterations} "
+                f"of {stored_iterations} interaction components"
+            )
+        else:
+            print("file found in cache, returning interaction components")
+        data.flags.writeable = False
+        _memory_put(memory_key, data, os.path.join(directory, f"{name}.json"))
     except FileNotFoundError:
         print(
             "File not found, check your inputs or consider running a simulation with these parameters"
@@ -174,7 +999,310 @@ def cache_reader(sourcefile: str, **params) -> np.ndarray:
     return data
 
 
-def cache_clear(index: Optional[int] = None) -> None:
+def cache_partial_reader(
+    sourcefile: str, key: Optional[str] = None, **params
+) -> Optional[Tuple[np.ndarray, dict]]:
+    """
+    Finds the cached entry with the most iterations below the requested number, so that a simulation can be extended rather than rerun. The local cache directory is searched before the shared ones.
+
+    Args:
+        sourcefile (str): The source file used to compute the interaction data from.
+        key (str, optional): The content-addressed key of the simulation. Defaults to None (match on the parameters and source file).
+        **params (Dict[str, Any]): The parameters of the requested simulation, as for cache_reader.
+
+    Returns:
+        Optional[Tuple[np.ndarray, dict]]: The cached components and the stored metadata of the entry (e.g. seed), including its 'file' name, or None if there is no such entry.
+    """
+    try:
+        entry = _find_entry(
+            sourcefile, key, params, "< ?", "iterations DESC, created DESC"
+        )
+        if entry is not None:
+            data, extra, name, size, _, _ = entry
+            _cache_stats["bytes_read"] += size
+            return data, extra | {"file": name}
+    except Exception as e:
+        print(f"Error reading cache: {e}")
+    return None
+
+
+def _stale_lock(path: str) -> bool:
+    """
+    Returns True if a lock file was left behind by a process on this machine that no longer exists.
+    """
+    try:
+        with open(path) as lock_file:
+            owner = json.load(lock_file)
+    except (OSError, ValueError):
+        # the lock is still being created, or has just been released
+        return False
+    if os.name != "posix" or owner.get("host") != socket.gethostname():
+        return False
+    try:
+        os.kill(owner["pid"], 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass
+    return False
+
+
+@contextlib.contextmanager
+def cache_lock(
+    key: str, timeout: Optional[float] = None, poll: float = 0.2, **params
+) -> Iterator[bool]:
+    """
+    Holds an advisory lock on a cache entry while it is being simulated, so that concurrent processes asking for the same entry wait for the first result instead of recomputing it.
+
+    The lock is an "in progress" marker file in the cache directory, created exclusively (O_EXCL) and removed when the block exits.
+    Locks left behind by processes on this machine that no longer exist are removed. If the lock is still held after the timeout, or cannot be created at all, the block runs without it: the worst case is duplicated work, never a corrupt entry, as entries are written atomically.
+
+    Args:
+        key (str): The content-addressed key of the simulation (see cache_key).
+        timeout (float, optional): The longest time in seconds to wait for the lock. Defaults to None (cache_lock_timeout).
+        poll (float, optional): The time in seconds between attempts to take the lock. Defaults to 0.2.
+        **params (Dict[str, Any]): Any further parameters that distinguish the entry (e.g. seed).
+
+    Yields:
+        bool: True if another process held the lock and this one waited for it, in which case the cache should be checked again before simulating.
+    """
+    name = hashlib.sha256(
+        json.dumps([key, params], sort_keys=True, default=str).encode()
+    ).hexdigest()[:32]
+    path = os.path.join(cache_dir, f"{name}.lock")
+    with contextlib.suppress(OSError):
+        os.makedirs(cache_dir, exist_ok=True)
+    deadline = time.monotonic() + (cache_lock_timeout if timeout is None else timeout)
+    waited = False
+    acquired = False
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if _stale_lock(path):
+                print("Removing a stale cache lock left by a process that has exited")
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                continue
+            if time.monotonic() >= deadline:
+                print("Timed out waiting for the cache lock, running the simulation")
+                break
+            if not waited:
+                print("Waiting for another process simulating the same cache entry")
+                waited = True
+            time.sleep(poll)
+            continue
+        except OSError as e:
+            print(f"Could not lock cache entry: {e}")
+            break
+        with os.fdopen(fd, "w") as lock_file:
+            json.dump(
+                {
+                    "pid": os.getpid(),
+                    "host": socket.gethostname(),
+                    "created": time.time(),
+                },
+                lock_file,
+            )
+        acquired = True
+        break
+    try:
+        yield waited
+    finally:
+        if acquired:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+
+def structure_cache_writer(name: str, **arrays: np.ndarray) -> None:
+    """
+    Writes a set of arrays describing a structure to the structure cache as a compressed .npz file.
+
+    The file is written to a temporary name and then moved into place, so a concurrent reader never sees a partially written entry. If the cache directory cannot be written to, the error is printed and nothing is cached.
+
+    Args:
+        name (str): The name of the cache entry, e.g. the hash of the source CIF file.
+        **arrays (np.ndarray): The arrays to store.
+    """
+    directory = os.path.join(cache_dir, "structures")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _atomic_write(
+            os.path.join(directory, f"{name}.npz"),
+            lambda fp: np.savez_compressed(fp, **arrays),
+        )
+    except Exception as e:
+        print(f"Error writing structure cache: {e}")
+
+
+def structure_cache_reader(name: str) -> Optional[dict]:
+    """
+    Reads a set of arrays written by structure_cache_writer, from the local cache directory or else the first shared cache directory that has it.
+
+    Args:
+        name (str): The name of the cache entry, e.g. the hash of the source CIF file.
+
+    Returns:
+        Optional[dict]: A dictionary of the stored arrays, or None if the entry does not exist or cannot be read.
+    """
+    for directory in [cache_dir, *cache_shared_dirs]:
+        path = os.path.join(directory, "structures", f"{name}.npz")
+        if os.path.isfile(path):
+            break
+    else:
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+    except Exception as e:
+        print(f"Error reading structure cache: {e}")
+        return None
+
+
+def _remove_entry(conn: sqlite3.Connection, name: str) -> bool:
+    """
+    Deletes the files and the index row of a cache entry, and returns True if it was deleted.
+
+    The arrays held in memory for the entry are dropped first. If a file is still in use (e.g. its payload is memory mapped by an array held elsewhere, which Windows does not allow to be deleted), the entry and its index row are kept and False is returned. The payload is deleted before the sidecar, so a kept entry is never left without its metadata.
+    """
+    _memory_evict(os.path.join(cache_dir, f"{name}.json"))
+    for extension in (".npy", ".json"):
+        path = os.path.join(cache_dir, name + extension)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except PermissionError as e:
+            print(f"Could not delete cache entry {name}, it is in use: {e}")
+            return False
+    conn.execute("DELETE FROM entries WHERE file = ?", (name,))
+    return True
+
+
+def set_cache_dir(path: Optional[str], shared: Optional[List[str]] = None) -> None:
+    """
+    Sets the cache directories. New entries are written to the local directory, which is created when first written to. Entries that are not in the local directory are looked up in the shared directories, in order, and copied to the local directory when read. The directories can also be set with the PYET_CACHE_DIR and PYET_CACHE_SHARED (a list separated by os.pathsep) environment variables.
+
+    Args:
+        path (Optional[str]): The local cache directory, or None for the default location.
+        shared (Optional[List[str]], optional): Read-only cache directories, e.g. on a network file system shared by several machines. Defaults to None (no shared directories).
+    """
+    global cache_dir, cache_shared_dirs
+    _memory_cache.clear()
+    cache_dir = (
+        _default_cache_dir()
+        if path is None
+        else os.path.abspath(os.path.expanduser(path))
+    )
+    cache_shared_dirs = [
+        os.path.abspath(os.path.expanduser(directory)) for directory in shared or []
+    ]
+
+
+def set_cache_limit(max_bytes: Optional[int]) -> None:
+    """
+    Sets the largest total size of the cached interaction components. Whenever a new entry is written, the least recently used entries are evicted until the cache fits. The limit can also be set with the PYET_CACHE_MAX_BYTES environment variable.
+
+    Args:
+        max_bytes (Optional[int]): The size limit in bytes, or None for no limit.
+    """
+    global cache_max_bytes
+    cache_max_bytes = max_bytes
+    if max_bytes is not None:
+        cache_prune(max_bytes=max_bytes)
+
+
+def set_memory_cache_limit(max_bytes: int) -> None:
+    """
+    Sets the largest total size of the arrays that cache_reader keeps in memory, evicting the least recently used arrays if needed. The limit can also be set with the PYET_MEMORY_CACHE_BYTES environment variable.
+
+    Args:
+        max_bytes (int): The size limit in bytes, or 0 to disable the in-memory cache.
+    """
+    global memory_cache_max_bytes
+    memory_cache_max_bytes = max_bytes
+    _memory_trim(max_bytes)
+
+
+def cache_prune(
+    max_bytes: Optional[int] = None,
+    max_age: Optional[float] = None,
+    keep: Optional[List[str]] = None,
+) -> dict:
+    """
+    Evicts cache entries without asking for confirmation, for use in scripts and long-running services.
+
+    Entries that have not been used (written or read) for more than max_age seconds are removed first. Then the least recently used entries are removed until the total size of the cache is at most max_bytes. Entries whose files are still in use (e.g. memory mapped by an array you hold, on Windows) are skipped and not counted.
+
+    Args:
+        max_bytes (Optional[int]): The largest total size of the cache in bytes. Defaults to None (no size limit).
+        max_age (Optional[float]): The longest time in seconds since an entry was last used. Defaults to None (no age limit).
+        keep (Optional[List[str]]): File names (without extension) of entries that must not be evicted. Defaults to None.
+
+    Returns:
+        dict: The number of 'entries' and 'bytes' that were evicted.
+    """
+    keep = set(keep or [])
+    removed = {"entries": 0, "bytes": 0}
+    if not os.path.isdir(cache_dir):
+        return removed
+    conn = _index_connect()
+    try:
+        with conn:
+            rows = conn.execute(
+                "SELECT file, bytes, accessed FROM entries ORDER BY accessed"
+            ).fetchall()
+            total = sum(size for _, size, _ in rows)
+            cutoff = None if max_age is None else time.time() - max_age
+            for name, size, accessed in rows:
+                if name in keep:
+                    continue
+                expired = cutoff is not None and accessed < cutoff
+                oversized = max_bytes is not None and total > max_bytes
+                if not (expired or oversized):
+                    continue
+                if not _remove_entry(conn, name):
+                    continue
+                total -= size
+                removed["entries"] += 1
+                removed["bytes"] += size
+    finally:
+        conn.close()
+    _cache_stats["evictions"] += removed["entries"]
+    return removed
+
+
+def cache_stats(reset: bool = False) -> dict:
+    """
+    Reports the cache statistics of this process and the current size of the cache.
+
+    Args:
+        reset (bool, optional): If True, the hit, miss, byte and eviction counters are reset to zero after reporting. Defaults to False.
+
+    Returns:
+        dict: The 'hits' (of which 'memory_hits' were served from memory), 'misses', 'bytes_read', 'bytes_written' and 'evictions' since the counters were last reset, the number of 'entries' and total 'bytes' in the cache, and the number of 'memory_entries' and total 'memory_bytes' held in memory.
+    """
+    conn = _index_connect(read_only=not os.access(cache_dir, os.W_OK))
+    try:
+        entries, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries"
+        ).fetchone()
+    finally:
+        conn.close()
+    stats = dict(
+        _cache_stats,
+        entries=entries,
+        bytes=size,
+        memory_entries=len(_memory_cache),
+        memory_bytes=sum(array.nbytes for array, _ in _memory_cache.values()),
+    )
+    if reset:
+        for counter in _cache_stats:
+            _cache_stats[counter] = 0
+    return stats
+
+
+def cache_clear(index: Optional[int] = None, confirm: bool = True) -> None:
     """
     Deletes cached files in the specified directory.
 
@@ -183,23 +1311,34 @@ def cache_clear(index: Optional[int] = None) -> None:
     If the index is out of range, it prints an error message and returns.
 
     If no index is provided, this function asks for confirmation and then deletes all cached files.
+    Each entry consists of a JSON sidecar and, unless it predates the binary format, a .npy payload; both are deleted.
 
     Args:
         index (Optional[int]): The index of the file to delete. If None, all files are deleted.
+        confirm (bool, optional): If False, the files are deleted without asking for confirmation. Defaults to True.
 
     Raises:
         JSONDecodeError: If a cached file does not contain valid JSON.
-        FileNotFoundError: If the directory or file does not exist.
     """
     directory = cache_dir
+    if not os.path.isdir(directory):
+        # nothing has been cached yet
+        return
     if index is None:
-        print("Are you sure you want to delete all the cache files? [Y/N]?")
-        res = input()
+        if confirm:
+            print("Are you sure you want to delete all the cache files? [Y/N]?")
+            res = input()
+        else:
+            res = "Y"
         match res:
             case "Y" | "y":
+                _memory_evict()
                 for file in os.listdir(directory):
-                    if file.endswith(".json"):
-                        os.remove(os.path.join(directory, file))
+                    if file.endswith((".json", ".npy")) or file == _INDEX_NAME:
+                        try:
+                            os.remove(os.path.join(directory, file))
+                        except PermissionError as e:
+                            print(f"Could not delete {file}, it is in use: {e}")
             case "N" | "n":
                 pass
             case _:
@@ -220,12 +1359,23 @@ def cache_clear(index: Optional[int] = None) -> None:
         print(
             f"File to delete: {os.path.basename(file)} Source file: {sourcefile}, Date created: {date}"
         )
-        print("Are you sure you want to delete this file? [Y/N]")
-        res = input()
+        if confirm:
+            print("Are you sure you want to delete this file? [Y/N]")
+            res = input()
+        else:
+            res = "Y"
         match res:
             case "Y" | "y":
-                os.remove(file)
-                print(f"Deleted file: {os.path.basename(file)}")
+                conn = _index_connect()
+                try:
+                    with conn:
+                        removed = _remove_entry(
+                            conn, os.path.splitext(os.path.basename(file))[0]
+                        )
+                finally:
+                    conn.close()
+                if removed:
+                    print(f"Deleted file: {os.path.basename(file)}")
             case "N" | "n":
                 print("File not deleted.")
 
@@ -234,7 +1384,7 @@ def cache_list() -> None:
     """
     Lists all cached files in the specified directory, sorted by creation date.
 
-    For each file, this function prints its index, name, size in bytes, source file, and creation date.
+    For each file, this function prints its index, name, size in bytes (including its .npy payload), source file, and creation date.
     It also prints the total size of all cached files in MB and a reminder to run "cache_clear()" to clear the cache.
 
     This function does not return anything.
@@ -251,6 +1401,9 @@ def cache_list() -> None:
     total_size = 0
     for index, file in enumerate(files):
         file_size = os.path.getsize(file)
+        payload = os.path.splitext(file)[0] + ".npy"
+        if os.path.exists(payload):
+            file_size += os.path.getsize(payload)
         total_size += file_size
         with open(file, "r") as f:
             data = json.load(f)
@@ -293,6 +1446,8 @@ def random_spectra(wavelength: np.ndarray, wavenumbers: bool = False) -> np.ndar
     Returns:
         np.ndarray: The total line spectrum in wavelength or wavenumbers.
     """
+    import scipy.stats as stats
+
     sigma1 = Gamma2sigma(rd.uniform(0.1, 5))
     sigma2 = Gamma2sigma(rd.uniform(0.1, 5))
     sigma3 = Gamma2sigma(rd.uniform(0.1, 5))
@@ -1,14 +1,364 @@
+import hashlib
 import os
 from typing import List, Optional, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
-import numpy.linalg as LA
 import pandas as pd
-from pymatgen.io.cif import CifParser
 
 from . import pyet_utils
-from .plotting import Plot, get_colours
+
+try:
+    from pyet_mc import _pyet_mc as pyrs
+
+    sim_single_cross_rs = pyrs.sim_single_cross
+except (ImportError, AttributeError):
+    sim_single_cross_rs = None
+
+
+def _periodic_neighbours(
+    lattice_matrix: np.ndarray,
+    frac_coords: np.ndarray,
+    centre: np.ndarray,
+    radius: float,
+) -> tuple:
+    """
+    Finds every periodic image of the unit cell sites within a radius of a point, without going through pymatgen.
+
+    The lattice translations that can reach the sphere are bounded using the spacing of the lattice planes, and the images are then generated a slab at a time so that memory stays proportional to a single layer of unit cells.
+
+    Parameters:
+    lattice_matrix (np.ndarray): The (3, 3) lattice matrix, with the lattice vectors as rows.
+    frac_coords (np.ndarray): The (N, 3) fractional coordinates of the sites in the unit cell.
+    centre (np.ndarray): The cartesian coordinates of the point to search around.
+    radius (float): The search radius in Angstroms.
+
+    Returns:
+    tuple: The unit cell index of each neighbour and an (M, 3) array of their cartesian coordinates. The point itself is excluded.
+    """
+    radius = float(radius)
+    inverse = np.linalg.inv(lattice_matrix)
+    # the reach along each lattice vector in fractional units is radius / plane spacing
+    reach = radius * np.linalg.norm(inverse, axis=0)
+    offsets = np.asarray(frac_coords, dtype=np.float64) - np.asarray(centre) @ inverse
+    lower = np.floor(-reach - offsets.max(axis=0)).astype(int)
+    upper = np.ceil(reach - offsets.min(axis=0)).astype(int)
+
+    tb, tc = np.meshgrid(
+        np.arange(lower[1], upper[1] + 1),
+        np.arange(lower[2], upper[2] + 1),
+        indexing="ij",
+    )
+    slab = np.column_stack((np.zeros(tb.size), tb.ravel(), tc.ravel()))
+    site_index = np.arange(len(offsets))
+
+    indices = []
+    coords = []
+    for ta in range(lower[0], upper[0] + 1):
+        slab[:, 0] = ta
+        # (translations, sites, 3) cartesian displacements from the centre
+        displacement = (
+            slab[:, np.newaxis, :] + offsets[np.newaxis, :, :]
+        ) @ lattice_matrix
+        r2 = np.einsum("ijk,ijk->ij", displacement, displacement)
+        mask = (r2 <= radius**2) & (r2 > 1e-16)
+        if mask.any():
+            indices.append(np.broadcast_to(site_index, r2.shape)[mask])
+            coords.append(displacement[mask])
+
+    if not indices:
+        return np.zeros(0, dtype=np.intp), np.zeros((0, 3))
+    return np.concatenate(indices), np.concatenate(coords) + centre
+
+
+# Upper bound on the number of random draws held in memory at once by the batched Monte Carlo
+_MAX_CHUNK_ELEMENTS = 2**22
+
+# The random stream of each Monte Carlo engine, as recorded in the cache. The batch engine
+# shares its stream with sweep, sim_multipole and the adaptive and streamed simulations.
+_ENGINE_GENERATORS = {"batch": "numpy", "loop": "numpy-loop", "rs": "rs"}
+
+# Number of iterations drawn and summed at a time within a block of iterations
+_SUB_BLOCK_ROWS = 1024
+
+
+def _interaction_exponent(interaction_type: Optional[str]) -> int:
+    """
+    Returns the distance exponent s of a multipolar interaction type.
+
+    Parameters:
+    interaction_type (str): The type of interaction. Can be 'DD', 'DQ', or 'QQ'.
+
+    Returns:
+    int: 6 for dipole-dipole, 8 for dipole-quadrupole and 10 for quadrupole-quadrupole.
+
+    Raises:
+    ValueError: If the interaction type is not recognised.
+    """
+    match interaction_type:
+        case "DD":
+            return 6
+        case "DQ":
+            return 8
+        case "QQ":
+            return 10
+        case _:
+            raise ValueError("Please specify interaction type")
+
+
+def _multipole_exponent(interaction_type: Union[str, float]) -> float:
+    """
+    Returns the distance exponent s of an interaction type, which may also be given directly as a number.
+
+    Parameters:
+    interaction_type (str or float): 'DD', 'DQ', 'QQ' or a numeric distance exponent.
+
+    Returns:
+    float: The distance exponent s.
+    """
+    if isinstance(interaction_type, (int, float)) and not isinstance(
+        interaction_type, bool
+    ):
+        return float(interaction_type)
+    return float(_interaction_exponent(interaction_type))
+
+
+def _seed_sequence(
+    seed: Union[None, int, np.random.SeedSequence, np.random.Generator],
+) -> np.random.SeedSequence:
+    """
+    Normalises the seed argument of the Monte Carlo methods to a SeedSequence.
+
+    Parameters:
+    seed (None, int, SeedSequence or Generator): None draws fresh entropy from the operating system, an int or SeedSequence is used as is, and a Generator contributes a newly spawned child of its own seed sequence.
+
+    Returns:
+    np.random.SeedSequence: The root of every random stream used by the run.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return seed.bit_generator.seed_seq.spawn(1)[0]
+    return np.random.SeedSequence(seed)
+
+
+def _seed_record(seed_sequence: np.random.SeedSequence) -> dict:
+    """
+    Returns the JSON-serialisable description of a SeedSequence that is stored in the cache metadata.
+    """
+    return {
+        "entropy": seed_sequence.entropy,
+        "spawn_key": list(seed_sequence.spawn_key),
+    }
+
+
+def _seed_from_record(record: dict) -> np.random.SeedSequence:
+    """
+    Rebuilds the SeedSequence described by a seed record from the cache metadata.
+    """
+    return np.random.SeedSequence(
+        record["entropy"], spawn_key=tuple(record["spawn_key"])
+    )
+
+
+def _block_rows(n_sites: int) -> int:
+    """
+    Returns the number of iterations in each block of a run over n_sites candidate sites.
+    """
+    return max(1, _MAX_CHUNK_ELEMENTS // max(n_sites, 1))
+
+
+def _iteration_blocks(
+    n_sites: int, iterations: int, seed_sequence: np.random.SeedSequence
+):
+    """
+    Splits a Monte Carlo run into blocks of iterations, each with an independent random stream.
+
+    Block k always covers the same iterations and draws from the k-th child of the seed sequence, so runs are bit-reproducible for a given seed, the blocks are statistically independent (and may be simulated in any order or in separate processes), and a shorter run is an exact prefix of a longer one. Blocks are sized so that at most _MAX_CHUNK_ELEMENTS random numbers are held in memory.
+
+    Parameters:
+    n_sites (int): The number of candidate sites drawn per iteration.
+    iterations (int): The total number of iterations.
+    seed_sequence (np.random.SeedSequence): The root seed of the run.
+
+    Yields:
+    tuple: (start, stop, rng) for each block, where rng is a np.random.Generator.
+    """
+    rows = _block_rows(n_sites)
+    for block, start in enumerate(range(0, iterations, rows)):
+        child = np.random.SeedSequence(
+            seed_sequence.entropy,
+            spawn_key=seed_sequence.spawn_key + (block,),
+            pool_size=seed_sequence.pool_size,
+        )
+        yield start, min(start + rows, iterations), np.random.default_rng(child)
+
+
+def _uniform_blocks(
+    n_sites: int,
+    iterations: int,
+    seed_sequence: np.random.SeedSequence,
+    start: int = 0,
+):
+    """
+    Draws the uniform random numbers of a Monte Carlo run one sub-block of iterations at a time.
+
+    Each block (see _iteration_blocks) is split into sub-blocks of _SUB_BLOCK_ROWS iterations on a fixed grid, and a sub-block is always drawn in full, even if the run ends inside it. The sums computed from a sub-block (whose rounding depends on the shape of the matrix product) are therefore the same whatever the length of the run, so a run is bit-identical to its prefixes, to its extensions and to any chunking of it. Sub-blocks that end before start are skipped without drawing them.
+
+    Parameters:
+    n_sites (int): The number of candidate sites drawn per iteration.
+    iterations (int): The total number of iterations.
+    seed_sequence (np.random.SeedSequence): The root seed of the run.
+    start (int, optional): The first iteration that is needed. Defaults to 0.
+
+    Yields:
+    tuple: (first, stop, uniform) for each sub-block, where uniform is the matrix of random numbers of the sub-block starting at iteration first, of which the first stop - first rows belong to the run.
+    """
+    rows = _block_rows(n_sites)
+    for block_start, block_stop, rng in _iteration_blocks(
+        n_sites, iterations, seed_sequence
+    ):
+        for first in range(block_start, block_stop, _SUB_BLOCK_ROWS):
+            size = min(_SUB_BLOCK_ROWS, block_start + rows - first)
+            stop = min(first + size, block_stop)
+            if stop <= start:
+                # one 64-bit draw per double
+                rng.bit_generator.advance(size * n_sites)
+                continue
+            yield first, stop, rng.random((size, n_sites))
+
+
+def _batched_r_i(
+    weights: np.ndarray,
+    concentration: float,
+    iterations: int,
+    seed_sequence: np.random.SeedSequence,
+    start: int = 0,
+) -> np.ndarray:
+    """
+    Runs the doping Monte Carlo for all iterations at once.
+
+    Each sub-block of iterations draws an (iterations x sites) occupancy matrix and multiplies it against the per-site weights (r0/r)^s, so the sum over the doped sites of every iteration is a single matrix-vector product.
+
+    Parameters:
+    weights (np.ndarray): The interaction weight of each candidate site.
+    concentration (float): The concentration of the dopant in % (e.g. 15 for 15%).
+    iterations (int): The number of doping configurations to simulate.
+    seed_sequence (np.random.SeedSequence): The root seed of the run.
+    start (int, optional): The first iteration to return. Earlier sub-blocks are skipped, so iterations start to iterations of a run can be simulated on their own and appended to its first start iterations. Defaults to 0.
+
+    Returns:
+    np.ndarray: The sum of the weights of the doped sites for iterations start to iterations.
+    """
+    fraction = concentration / 100
+    r_i = np.zeros(iterations - start)
+    sub_blocks = _uniform_blocks(len(weights), iterations, seed_sequence, start)
+    for first, stop, uniform in sub_blocks:
+        values = (uniform < fraction) @ weights
+        skip = max(start - first, 0)
+        r_i[first + skip - start : stop - start] = values[skip : stop - first]
+    return r_i
+
+
+class NeighbourTable:
+    """
+    An array-backed table of the ions surrounding a central ion. All coordinates are held in contiguous float64 arrays and the species of each neighbour is stored as an integer code into a small array of species labels, so that filtering and distance calculations can be carried out in single vectorised passes rather than per site.
+
+    Attributes:
+    origin (np.ndarray): The cartesian coordinates of the central ion.
+    xyz (np.ndarray): An (N, 3) array of the cartesian coordinates of each neighbour.
+    r (np.ndarray): The radial distance of each neighbour from the central ion in Angstroms.
+    theta (np.ndarray): The polar angle of each neighbour in degrees.
+    phi (np.ndarray): The azimuthal angle of each neighbour in degrees.
+    species_codes (np.ndarray): An integer code for the species of each neighbour, indexing into species_labels.
+    species_labels (np.ndarray): The unique species labels, e.g. ['F', 'K', 'Y'].
+    """
+
+    def __init__(
+        self,
+        xyz: np.ndarray,
+        species_codes: np.ndarray,
+        species_labels: np.ndarray,
+        origin: np.ndarray,
+    ):
+        """
+        Initializes the NeighbourTable from cartesian coordinates, computing the spherical coordinates in one pass.
+
+        Parameters:
+        xyz (np.ndarray): An (N, 3) array of the cartesian coordinates of each neighbour.
+        species_codes (np.ndarray): An integer code for the species of each neighbour.
+        species_labels (np.ndarray): The species labels the codes index into.
+        origin (np.ndarray): The cartesian coordinates of the central ion.
+        """
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.xyz = np.ascontiguousarray(xyz, dtype=np.float64).reshape(-1, 3)
+        self.species_codes = np.ascontiguousarray(species_codes, dtype=np.intp)
+        self.species_labels = np.asarray(species_labels)
+
+        relative = self.xyz - self.origin
+        self.r = np.sqrt(np.einsum("ij,ij->i", relative, relative))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.theta = 180 / (np.pi) * np.arccos(relative[:, 2] / self.r)
+        self.phi = 180 / (np.pi) * np.arctan2(relative[:, 1], relative[:, 0])
+
+    def __len__(self) -> int:
+        return len(self.r)
+
+    @property
+    def species(self) -> np.ndarray:
+        """The species label of each neighbour."""
+        return self.species_labels[self.species_codes]
+
+    def species_mask(self, species: str) -> np.ndarray:
+        """
+        Returns a boolean mask selecting the neighbours of a given species.
+
+        Parameters:
+        species (str): The species label to select, e.g. "Y3+".
+
+        Returns:
+        np.ndarray: A boolean array, True where the neighbour is of the given species.
+        """
+        codes = np.flatnonzero(self.species_labels == species)
+        return np.isin(self.species_codes, codes)
+
+    def subset(self, index: Union[np.ndarray, slice]) -> "NeighbourTable":
+        """
+        Returns a new NeighbourTable containing only the selected neighbours.
+
+        Parameters:
+        index (np.ndarray or slice): A boolean mask, integer index array or slice.
+
+        Returns:
+        NeighbourTable: The selected neighbours, sharing the same species labels and origin.
+        """
+        table = NeighbourTable.__new__(NeighbourTable)
+        table.origin = self.origin
+        table.species_labels = self.species_labels
+        table.xyz = self.xyz[index]
+        table.species_codes = self.species_codes[index]
+        table.r = self.r[index]
+        table.theta = self.theta[index]
+        table.phi = self.phi[index]
+        return table
+
+    def cartesian_frame(self) -> pd.DataFrame:
+        """
+        Returns a DataFrame with columns 'x', 'y', 'z', and 'species'.
+        """
+        frame = pd.DataFrame(self.xyz, columns=["x", "y", "z"])
+        frame["species"] = self.species
+        return frame
+
+    def spherical_frame(self) -> pd.DataFrame:
+        """
+        Returns a DataFrame with columns 'r', 'theta', 'phi', and 'species'.
+        """
+        frame = pd.DataFrame(
+            np.column_stack((self.r, self.theta, self.phi)),
+            columns=["r", "theta", "phi"],
+        )
+        frame["species"] = self.species
+        return frame
 
 
 class Structure:
@@ -18,6 +368,7 @@ class Structure:
     Methods:
     __init__(self, cif_file): Initializes the Structure using a CIF file.
     centre_ion(self,ion): Identifies the index of a specified ion in the structure.
+    neighbour_table(self, radius): Returns a NeighbourTable of the neighbors within a specified radius of the central ion.
     nearest_neighbours_info(self, radius): Prints the species and radial distance of the neighbors within a specified radius of the central ion.
     nearest_neighbours_coords(self, radius): Returns the coordinates of the neighbors within a specified radius of the central ion in x,y,z coords.
     nearest_neighbours_spherical_coords(self,radius): Returns the coordinates of the neighbors within a specified radius of the central ion in spherical coords.
@@ -25,32 +376,82 @@ class Structure:
     """
     '''
 
-    def __init__(self, cif_file: str):
+    def __init__(
+        self, cif_file: str, neighbour_engine: str = "pymatgen", cache: bool = False
+    ):
         """
         Initializes the Structure object with a CIF file.
 
         Parameters:
         cif_file (str): The path to the CIF file to parse.
+        neighbour_engine (str, optional): The neighbour search used for radius queries. 'pymatgen' (default) uses pymatgen's neighbour list, 'native' enumerates the lattice translations directly with NumPy, which is considerably faster at large radii.
+        cache (bool, optional): If True, the parsed lattice, species and fractional coordinates are stored in the cache directory keyed by a hash of the CIF contents, along with the neighbour table of each central ion. Later runs on the same CIF skip parsing entirely. Defaults to False.
 
         Sets:
-        self.cif (CifParser): The CifParser object for the CIF file.
+        self.cif (CifParser): The CifParser object for the CIF file, parsed on first access when the structure was loaded from the cache.
         self.struct (Structure): The first structure from the parsed CIF file.
+        self.cif_hash (str): The SHA-256 hash of the CIF file contents.
 
         Raises:
         FileNotFoundError: If the CIF file path does not exist.
-        ValueError: If the CIF file cannot be parsed.
+        ValueError: If the CIF file cannot be parsed or the neighbour engine is not recognised.
         """
+        if neighbour_engine not in ("pymatgen", "native"):
+            raise ValueError(
+                f"Unknown neighbour engine: {neighbour_engine!r}. "
+                f"Supported: 'pymatgen', 'native'"
+            )
+        self.neighbour_engine = neighbour_engine
         if not os.path.isfile(cif_file):
             raise FileNotFoundError(
                 f"CIF file not found: {cif_file!r}. "
                 f"Please provide a valid path to a .cif file."
             )
         self.filename = os.path.basename(cif_file)
-        try:
-            self.cif = CifParser(cif_file)
-            self.struct = self.cif.parse_structures(primitive=False)[0]
-        except Exception as e:
-            raise ValueError(f"Failed to parse CIF file '{cif_file}': {e}") from e
+        self.cif_file = cif_file
+        self.cache = cache
+        with open(cif_file, "rb") as f:
+            self.cif_hash = hashlib.sha256(f.read()).hexdigest()
+
+        self._cif = None
+        compiled = pyet_utils.structure_cache_reader(self.cif_hash) if cache else None
+        if compiled is not None:
+            from pymatgen.core import Structure as PymatgenStructure
+
+            self.struct = PymatgenStructure(
+                compiled["lattice"],
+                compiled["species"].tolist(),
+                compiled["frac_coords"],
+            )
+        else:
+            try:
+                self.struct = self.cif.parse_structures(primitive=False)[0]
+            except Exception as e:
+                raise ValueError(f"Failed to parse CIF file '{cif_file}': {e}") from e
+            # disordered sites cannot be rebuilt from species strings, so they are never cached
+            if cache and self.struct.is_ordered:
+                pyet_utils.structure_cache_writer(
+                    self.cif_hash,
+                    lattice=self.struct.lattice.matrix,
+                    species=np.array([site.species_string for site in self.struct]),
+                    frac_coords=self.struct.frac_coords,
+                )
+        self.species_labels, self.site_species_codes = np.unique(
+            [site.species_string for site in self.struct.sites], return_inverse=True
+        )
+        self._species_systems = np.empty(len(self.species_labels), dtype=object)
+        for site, code in zip(self.struct.sites, self.site_species_codes):
+            self._species_systems[code] = site.species.chemical_system
+        self._neighbour_memo = None
+
+    @property
+    def cif(self):
+        """The CifParser object for the CIF file, parsed on first access."""
+        if self._cif is None:
+            from pymatgen.io.cif import CifParser
+
+            self._cif = CifParser(self.cif_file)
+        return self._cif
 
     def centre_ion(self, ion: str) -> None:
         """
@@ -69,6 +470,8 @@ class Structure:
         ValueError: If the specified ion is not found in the structure.
         """
         structure_sites = self.struct.sites
+        # neighbour shells are relative to the old centre, so the memo is no longer valid
+        self._neighbour_memo = None
         found = False
         for i in range(len(structure_sites)):
             temp = structure_sites[i]
@@ -78,6 +481,8 @@ class Structure:
                 self.centre_ion_species = self.site.species_string
                 self.origin = self.site.coords
                 print(f"central ion is {self.site}")
+                if self.cache:
+                    self._load_neighbour_memo()
                 self.get_R0()
                 found = True
                 break
@@ -90,15 +495,31 @@ class Structure:
 
     def get_R0(self) -> None:
         # # Get the radial distance of the closest ion of the same species within a hard coded 50 angstroms
-        nn_info = self.nearest_neighbours_spherical_coords(50)
-        same_species = nn_info.query("species == @self.centre_ion_species")
-        closest_index = same_species["r"].idxmin()
+        table = self.neighbour_table(50)
+        same_species = table.r[table.species_mask(self.centre_ion_species)]
 
-        self.r0 = same_species.loc[closest_index, "r"]
+        self.r0 = same_species.min()
         print(
             f"with a nearest neighbour {self.centre_ion_species} at {self.r0} angstroms"
         )
 
+    def number_density(self, species: Optional[str] = None) -> float:
+        """
+        Computes the number of ions of a species per unit volume of the structure.
+
+        Parameters:
+        species (str, optional): The species to count, e.g. 'Y'. Defaults to the species of the central ion.
+
+        Returns:
+        float: The number density in ions per cubic angstrom.
+        """
+        if species is None:
+            species = self.centre_ion_species
+        count = np.count_nonzero(
+            self.species_labels[self.site_species_codes] == species
+        )
+        return count / self.struct.volume
+
     def nearest_neighbours_info(self, radius: float) -> None:
         """
         Prints the species and radial distance of the neighbors within a specified radius of the central ion.
@@ -107,23 +528,83 @@ class Structure:
         radius (float/int): The radius within which to find neighbors.
 
         Sets:
-        self.nn (list): The list of neighbors within the specified radius.
+        self.nn (NeighbourTable): The neighbors within the specified radius.
 
         Prints:
         A formatted string with the species and radial distance of each neighbor.
         """
-        self.nn = self.struct.get_neighbors(self.site, radius)
+        self.nn = self.neighbour_table(radius)
+        systems = self._species_systems[self.nn.species_codes]
         s = ""
         heading = f"Nearest neighbours within radius {radius} Angstroms of a {self.centre_ion_species} ion:\n"
         s += heading
-        for n in self.nn:
-            s += "Species = %s, r = %f Angstrom\n" % (
-                n[0].species.chemical_system,
-                self.site.distance(n[0]),
-            )
+        for species, r in zip(systems, self.nn.r):
+            s += "Species = %s, r = %f Angstrom\n" % (species, r)
         s += "\n"
         print(s)
 
+    def neighbour_table(self, radius: float) -> NeighbourTable:
+        """
+        Returns the neighbors within a specified radius of the central ion as a NeighbourTable, sorted by radial distance.
+
+        The largest neighbour table computed so far is kept, so any query at a smaller radius is answered by slicing it rather than repeating the neighbour search. The memo is cleared whenever centre_ion is called.
+
+        Parameters:
+        radius (float/int): The radius within which to find neighbors.
+
+        Returns:
+        NeighbourTable: The coordinates and species of the ions within radius r, excluding the central ion itself.
+        """
+        memo = self._neighbour_memo
+        if memo is not None and radius <= memo[0]:
+            table = memo[1]
+            return table.subset(slice(0, np.searchsorted(table.r, radius, "right")))
+
+        table = self._search_neighbours(radius)
+        table = table.subset(np.argsort(table.r, kind="stable"))
+        self._neighbour_memo = (radius, table)
+        if self.cache:
+            pyet_utils.structure_cache_writer(
+                f"{self.cif_hash}_{self.ion_index}",
+                radius=radius,
+                xyz=table.xyz,
+                species_codes=table.species_codes,
+            )
+        return table
+
+    def _load_neighbour_memo(self) -> None:
+        """
+        Restores the neighbour memo of the current central ion from the structure cache, if one has been stored.
+        """
+        stored = pyet_utils.structure_cache_reader(f"{self.cif_hash}_{self.ion_index}")
+        if stored is not None:
+            table = NeighbourTable(
+                stored["xyz"], stored["species_codes"], self.species_labels, self.origin
+            )
+            self._neighbour_memo = (float(stored["radius"]), table)
+
+    def _search_neighbours(self, radius: float) -> NeighbourTable:
+        """
+        Runs the neighbour search of the selected engine, returning an unsorted NeighbourTable.
+        """
+        if self.neighbour_engine == "native":
+            points, xyz = _periodic_neighbours(
+                self.struct.lattice.matrix, self.struct.frac_coords, self.origin, radius
+            )
+        else:
+            _, points, images, distances = self.struct.get_neighbor_list(
+                radius, sites=[self.site]
+            )
+            # get_neighbor_list reports the central ion itself at r = 0 when sites is given
+            keep = distances > 1e-8
+            points = points[keep]
+            xyz = self.struct.lattice.get_cartesian_coords(
+                self.struct.frac_coords[points] + images[keep]
+            )
+        return NeighbourTable(
+            xyz, self.site_species_codes[points], self.species_labels, self.origin
+        )
+
     def nearest_neighbours_coords(self, radius: float) -> pd.DataFrame:
         """
         Returns the coordinates of the neighbors within a specified radius of the central ion in cartesian coordinates .
@@ -134,20 +615,7 @@ class Structure:
         Returns:
         DataFrame: A DataFrame with columns 'x', 'y', 'z', and 'species', containing the cartesian coordinates coordinates and species of ions within radius r.
         """
-        NN = self.struct.get_neighbors(self.site, radius)
-        XYZ = np.zeros([len(NN), 3])
-        Species_info = []
-        for i, N in enumerate(NN):
-            xyz = N[0].coords
-            XYZ[i, 0] = xyz[0]
-            XYZ[i, 1] = xyz[1]
-            XYZ[i, 2] = xyz[2]
-            Species_info.append(NN[i].species_string)
-
-        Species_info = pd.DataFrame(np.asarray(Species_info), columns=["species"])
-        coordinate_df = pd.DataFrame(XYZ, columns=["x", "y", "z"])
-        nearest_neigbours = pd.concat([coordinate_df, Species_info], axis=1)
-        return nearest_neigbours
+        return self.neighbour_table(radius).cartesian_frame()
 
     def nearest_neighbours_spherical_coords(self, radius: float) -> pd.DataFrame:
         """
@@ -157,23 +625,9 @@ class Structure:
         radius (float/int): The radius within which to find neighbors.
 
         Returns:
-        DataFrame: A DataFrame with columns 'x', 'y', 'z', and 'species', containing the spherical coordinates coordinates and species of ions within radius r.
+        DataFrame: A DataFrame with columns 'r', 'theta', 'phi', and 'species', containing the spherical coordinates coordinates and species of ions within radius r.
         """
-        NN = self.struct.get_neighbors(self.site, radius)
-
-        spc = np.zeros([len(NN), 3])
-        Species_info = []
-        for i, N in enumerate(NN):
-            xyz = N[0].coords - self.origin
-            spc[i, 0] = LA.norm(xyz)
-            spc[i, 1] = 180 / (np.pi) * (np.arccos(xyz[2] / spc[i, 0]))
-            spc[i, 2] = 180 / (np.pi) * (np.arctan2(xyz[1], xyz[0]))
-            Species_info.append(NN[i].species_string)
-
-        Species_info = pd.DataFrame(np.asarray(Species_info), columns=["species"])
-        coordinate_df = pd.DataFrame(spc, columns=["r", "theta", "phi"])
-        nearest_neigbours = pd.concat([coordinate_df, Species_info], axis=1)
-        return nearest_neigbours
+        return self.neighbour_table(radius).spherical_frame()
 
     def structure_plot(
         self, radius: float, filter: Optional[List[str]] = None
@@ -188,6 +642,8 @@ class Structure:
         Returns:
         None. The function directly plots the 3D structure using matplotlib.
         """
+        from .plotting import Plot, get_colours
+
         coords_xyz = self.nearest_neighbours_coords(radius)
         UniqueNames = coords_xyz.species.unique()
 
@@ -248,7 +704,14 @@ class Interaction:
     __init__(self, structure): Initializes the Interaction with a Structure instance.
     distance_sim(self, radius): Computes spherical coordinates of same-species ions within a given radius and stores them in self.filtered_coords.
     doper(self, concentration, dopant, return_coords): Randomly assigns dopant species to filtered_coords and returns radial distances (default) or full DataFrame with r, theta, phi, species (return_coords=True). Must call distance_sim() first.
+    site_weights(self, radius, s, intrinsic): Computes the interaction weight (r0/r)^s of every same-species site within a given radius.
     sim_single_cross(self, radius, concentration, iterations, interaction_type): Simulates a single cross-relaxation interaction within a given radius (calls distance_sim and doper internally).
+    truncation_tail(self, radius, concentration, interaction_type): Estimates the contribution of the sites beyond the simulation radius.
+    sim_single_cross_stream(self, radius, concentration, iterations, interaction_type): Yields the simulation block by block with running statistics.
+    sim_single_cross_adaptive(self, radius, concentration, interaction_type, tolerance): Simulates a single cross-relaxation interaction until the ensemble decay has converged to a tolerance.
+    sweep(self, radius, concentrations, iterations, interaction_type): Simulates several concentrations in one pass using common random numbers.
+    sim_multipole(self, radius, concentration, iterations, interaction_types): Simulates several interaction types from the same doping configurations.
+    shell_model(self, radius, concentration, interaction_type): Describes the same interaction exactly with the shell model, without Monte Carlo.
     doped_structure_plot(self, radius, concentration, dopant, filter): Generates a 3D plot of the structure including dopant ions.
     """
 
@@ -292,16 +755,17 @@ class Interaction:
             distances = crystal_interaction.doper(concentration=15, dopant='Sm3+')
         """
 
-        coords = self.structure.nearest_neighbours_spherical_coords(radius)
-        self.filtered_coords = coords.loc[
-            coords["species"].isin([self.structure.centre_ion_species])
-        ].reset_index(drop=True)
+        table = self.structure.neighbour_table(radius)
+        self.filtered_coords = table.subset(
+            table.species_mask(self.structure.centre_ion_species)
+        ).spherical_frame()
 
     def doper(
         self,
         concentration: float,
         dopant: Optional[str] = "acceptor",
         return_coords: bool = False,
+        seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
     ) -> Union[np.ndarray, pd.DataFrame]:
         """
         Randomly assigns dopant species to the filtered coordinates based on the given
@@ -315,6 +779,7 @@ class Interaction:
             and species columns showing the full doped configuration (both doped and
             undoped sites). If False (default), returns only the radial distances of
             the dopant ions as a numpy array.
+        seed (None, int, SeedSequence or Generator, optional): The random seed or generator to draw the doping configuration from. A Generator is used directly, so repeated calls with the same Generator give successive configurations. Defaults to None (fresh entropy).
 
         Returns:
         numpy.ndarray: An array of radial distances (in Angstroms) to the dopant ions (default).
@@ -341,7 +806,8 @@ class Interaction:
         concentration = concentration / 100
 
         # Use vectorized operation to update 'species'
-        mask = np.random.rand(len(self.filtered_coords)) < concentration
+        rng = np.random.default_rng(seed)
+        mask = rng.random(len(self.filtered_coords)) < concentration
         self.filtered_coords.loc[mask, "species"] = dopant
 
         if return_coords:
@@ -356,6 +822,58 @@ class Interaction:
 
         return result
 
+    def site_weights(
+        self, radius: float, s: float, intrinsic: bool = False
+    ) -> np.ndarray:
+        """
+        Computes the interaction weight (r0/r)^s of every same-species site within a given radius of the central ion.
+
+        Parameters:
+        radius (float/int): The radius within which to find same-species ions.
+        s (float): The distance exponent of the interaction, e.g. 8 for dipole-quadrupole.
+        intrinsic (bool, optional): If True, the weights are 1/r^s rather than being scaled by the nearest neighbour distance r0. Defaults to False.
+
+        Returns:
+        np.ndarray: The weight of each candidate acceptor site.
+        """
+        self.distance_sim(radius)
+        distances = self.filtered_coords["r"].to_numpy()
+        scale = 1.0 if intrinsic else self.structure.r0
+        return np.power(scale / distances, s)
+
+    def _cache_params(
+        self,
+        radius: float,
+        concentration: float,
+        iterations: int,
+        interaction_type: Union[str, float],
+        intrinsic: bool,
+    ) -> dict:
+        """
+        Returns the cache_reader/cache_writer arguments of a single cross-relaxation simulation.
+
+        The content-addressed key covers the CIF file contents, the central ion, the radius, the concentration, the distance exponent, the r0 mode and the pyet_mc version, so entries are never shared between different crystals that happen to have the same file name. Entries written before content keys existed have no key, so they are never matched and those simulations are run again.
+        """
+        key = pyet_utils.cache_key(
+            process="singlecross",
+            cif=self.structure.cif_hash,
+            centre_ion=int(self.structure.ion_index),
+            radius=float(radius),
+            concentration=float(concentration),
+            s=_multipole_exponent(interaction_type),
+            intrinsic=bool(intrinsic),
+        )
+        return dict(
+            key=key,
+            sourcefile=self.structure.filename,
+            process="singlecross",
+            radius=radius,
+            concentration=concentration,
+            iterations=iterations,
+            interaction_type=interaction_type,
+            intrinsic=intrinsic,
+        )
+
     def sim_single_cross(
         self,
         radius: float,
@@ -363,68 +881,528 @@ class Interaction:
         iterations: int,
         interaction_type: Optional[str] = None,
         intrinsic: bool = False,
+        engine: str = "batch",
+        seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
+        tail_correction: bool = False,
     ) -> Union[float, Exception]:
         """
         Simulates a single cross-relaxation interaction within a given radius.
 
+        While a simulation runs, its cache entry is locked (see pyet_utils.cache_lock), so a concurrent process asking for the same simulation waits for the result instead of recomputing it.
+
         Parameters:
         radius (float/int): The radius within which to simulate interactions.
         concentration (float): The concentration of the dopant.
         iterations (int): The number of iterations to run the simulation.
         interaction_type (str): The type of interaction. Can be 'DD', 'DQ', or 'QQ'. This must be set.
+        intrinsic (bool, optional): If True, the interaction components are not scaled by the nearest neighbour distance r0. Defaults to False.
+        engine (str, optional): 'batch' (default) simulates blocks of iterations as a single occupancy matrix product, 'rs' runs the iterations in parallel in the Rust extension and 'loop' dopes the structure one iteration at a time with doper().
+        seed (None, int, SeedSequence or Generator, optional): The seed of the run. Runs with the same seed and engine are bit-reproducible, and the seed and random stream (generator) of the engine are recorded in the cache metadata. If a seed is given, only cached results simulated with that seed and engine's stream are reused. Defaults to None (fresh entropy).
+        tail_correction (bool, optional): If True, the mean contribution of the sites beyond the radius (see truncation_tail) is added to every r_i. The cache always stores the uncorrected r_i. Defaults to False.
+
+        Sets:
+        self.tail_estimate (dict): The truncation_tail estimate, if tail_correction is True.
 
         Returns:
-        float: The average of r_i, which represents the simulated interaction.
+        np.ndarray: The interaction components r_i of every iteration. The array is read-only, whether it was simulated or read from the cache; copy it with np.array() to modify it.
         """
-        process = "singlecross"
-        cache_data = pyet_utils.cache_reader(
-            sourcefile=self.structure.filename,
-            process=process,
-            radius=radius,
-            concentration=concentration,
-            iterations=iterations,
-            interaction_type=interaction_type,
-            intrinsic=intrinsic,
+        if engine not in _ENGINE_GENERATORS:
+            raise ValueError(
+                f"Unknown Monte Carlo engine: {engine!r}. "
+                f"Supported: 'batch', 'rs', 'loop'"
+            )
+        if engine == "rs" and sim_single_cross_rs is None:
+            raise RuntimeError(
+                "engine='rs' requires the Rust extension 'pyet_mc._pyet_mc', which could not be imported."
+            )
+        seed_sequence = _seed_sequence(seed)
+        seed_record = _seed_record(seed_sequence)
+        generator = _ENGINE_GENERATORS[engine]
+        cache_params = self._cache_params(
+            radius, concentration, iterations, interaction_type, intrinsic
+        )
+        seed_params = (
+            {} if seed is None else {"seed": seed_record, "generator": generator}
         )
-        match cache_data:
-            case None:
-                print("Simulator: File not found in cache, running simulation")
-                match interaction_type:
-                    case "DD":
-                        s = 6
-                    case "DQ":
-                        s = 8
-                    case "QQ":
-                        s = 10
-                    case _:
-                        raise ValueError("Please specify interaction type")
-
-                r_i = np.zeros(iterations)
-                self.distance_sim(radius)
-                for i in range(len(r_i)):
-                    distances = self.doper(concentration, dopant="acceptor")
-                    if intrinsic == True:
-                        tmp = np.ones(len(distances))
+        cache_data = pyet_utils.cache_reader(**cache_params, **seed_params)
+        if cache_data is None:
+            with pyet_utils.cache_lock(cache_params["key"], **seed_params) as waited:
+                if waited:
+                    # another process may have just simulated this entry
+                    cache_data = pyet_utils.cache_reader(**cache_params, **seed_params)
+                if cache_data is None:
+                    s = _interaction_exponent(interaction_type)
+                    # a shorter batch-engine run can be extended block by block
+                    partial = None
+                    if engine == "batch":
+                        partial = pyet_utils.cache_partial_reader(
+                            **cache_params,
+                            generator=generator,
+                            **({} if seed is None else {"seed": seed_record}),
+                        )
+                    supersedes = None
+                    stored_seed = seed_record
+                    if partial is None:
+                        print("Simulator: File not found in cache, running simulation")
+                    else:
+                        print(
+                            f"Simulator: File found in cache with {len(partial[0])} "
+                            f"of {iterations} iterations, simulating the remaining "
+                            f"{iterations - len(partial[0])}"
+                        )
+
+                    if partial is not None:
+                        cached, stored = partial
+                        # the extension continues the stream the cached run was drawn from
+                        stored_seed = stored["seed"]
+                        supersedes = stored["file"]
+                        weights = self.site_weights(radius, s, intrinsic)
+                        extension = _batched_r_i(
+                            weights,
+                            concentration,
+                            iterations,
+                            _seed_from_record(stored_seed),
+                            start=len(cached),
+                        )
+                        r_i = np.concatenate([cached, extension])
+                        # release the memory map, so the superseded entry can be deleted
+                        cached = partial = None
+                    elif engine == "batch":
+                        weights = self.site_weights(radius, s, intrinsic)
+                        r_i = _batched_r_i(
+                            weights, concentration, iterations, seed_sequence
+                        )
+                    elif engine == "rs":
+                        self.distance_sim(radius)
+                        r_i = sim_single_cross_rs(
+                            np.ascontiguousarray(
+                                self.filtered_coords["r"], dtype=np.float64
+                            ),
+                            concentration / 100,
+                            float(s),
+                            1.0 if intrinsic else float(self.structure.r0),
+                            iterations,
+                            int(seed_sequence.generate_state(1, np.uint64)[0]),
+                        )
                     else:
-                        tmp = np.full(len(distances), self.structure.r0)
+                        r_i = np.zeros(iterations)
+                        self.distance_sim(radius)
+                        blocks = _iteration_blocks(
+                            len(self.filtered_coords), iterations, seed_sequence
+                        )
+                        for start, stop, rng in blocks:
+                            for i in range(start, stop):
+                                distances = self.doper(
+                                    concentration, dopant="acceptor", seed=rng
+                                )
+                                if intrinsic == True:
+                                    tmp = np.ones(len(distances))
+                                else:
+                                    tmp = np.full(len(distances), self.structure.r0)
+
+                                r_tmp = np.sum(np.power((tmp / distances), s))
+                                r_i[i] = r_tmp
+
+                    pyet_utils.cache_writer(
+                        r_i,
+                        **cache_params,
+                        seed=stored_seed,
+                        generator=generator,
+                        supersedes=supersedes,
+                    )
+        if cache_data is not None:
+            r_i = cache_data
+
+        if tail_correction:
+            self.tail_estimate = self.truncation_tail(
+                radius, concentration, interaction_type, intrinsic
+            )
+            r_i = r_i + self.tail_estimate["mean"]
+        r_i.flags.writeable = False
+        return r_i
+
+    def truncation_tail(
+        self,
+        radius: float,
+        concentration: float,
+        interaction_type: Optional[str] = None,
+        intrinsic: bool = False,
+    ) -> dict:
+        """
+        Estimates the contribution to r_i of the same-species sites beyond the simulation radius, which sim_single_cross neglects.
+
+        Beyond the radius the sites are treated as a continuum with the number density rho of the central ion's species. The continuum starts at the radius R_eff of the sphere that holds as many sites as the structure does within the radius (including the central ion), which matches the continuum to the discrete shells that were simulated. Each site is doped with probability c, so the tail adds on average
+
+            c * rho * 4 * pi * r0^s * R_eff^(3 - s) / (s - 3)
+
+        to r_i, with a configuration-to-configuration standard deviation of
+
+            sqrt(c * (1 - c) * rho * 4 * pi * r0^(2s) * R_eff^(3 - 2s) / (2s - 3)).
+
+        Parameters:
+        radius (float/int): The radius of the simulation.
+        concentration (float): The concentration of the dopant in % (e.g. 15 for 15%).
+        interaction_type (str): The type of interaction. Can be 'DD', 'DQ', or 'QQ'. This must be set.
+        intrinsic (bool, optional): If True, r0 is taken as 1, as for intrinsic interaction components. Defaults to False.
+
+        Returns:
+        dict: 'radius' is R_eff, 'mean' is the mean-field correction to add to r_i and 'std' is the standard deviation of the neglected tail, a truncation-error estimate for a single r_i.
+        """
+        s = _interaction_exponent(interaction_type)
+        fraction = concentration / 100
+        density = self.structure.number_density()
+        self.distance_sim(radius)
+        sites = len(self.filtered_coords) + 1
+        effective_radius = (3 * sites / (4 * np.pi * density)) ** (1 / 3)
+        scale = 1.0 if intrinsic else self.structure.r0
+        shell = 4 * np.pi * density
+        mean = fraction * shell * scale**s * effective_radius ** (3 - s) / (s - 3)
+        variance = (
+            fraction
+            * (1 - fraction)
+            * shell
+            * scale ** (2 * s)
+            * effective_radius ** (3 - 2 * s)
+            / (2 * s - 3)
+        )
+        return {
+            "radius": float(effective_radius),
+            "mean": float(mean),
+            "std": float(np.sqrt(variance)),
+        }
+
+    def sim_single_cross_stream(
+        self,
+        radius: float,
+        concentration: float,
+        iterations: int,
+        interaction_type: Optional[str] = None,
+        intrinsic: bool = False,
+        bins: Union[int, np.ndarray] = 100,
+        seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
+        chunk_size: int = 10000,
+    ):
+        """
+        Simulates a single cross-relaxation interaction as a stream of chunks, rather than returning every r_i at the end.
+
+        Each chunk of r_i is yielded as soon as it is simulated, together with running statistics of everything simulated so far. Only about one chunk is held in memory at a time, so long simulations can drive a progress display, be checkpointed or be written straight to a compressed file with flat memory use. Streamed results are not cached.
+
+        Parameters:
+        radius (float/int): The radius within which to simulate interactions.
+        concentration (float): The concentration of the dopant in % (e.g. 15 for 15%).
+        iterations (int): The total number of iterations to run.
+        interaction_type (str): The type of interaction. Can be 'DD', 'DQ', or 'QQ'. This must be set.
+        intrinsic (bool, optional): If True, the interaction components are not scaled by the nearest neighbour distance r0. Defaults to False.
+        bins (int or np.ndarray, optional): The histogram bin edges, or a number of equal bins between 0 and the largest possible r_i (every site doped). Defaults to 100.
+        seed (None, int, SeedSequence or Generator, optional): The seed of the run. The concatenated chunks are identical to sim_single_cross with the same seed, whatever the chunk size. Defaults to None (fresh entropy).
+        chunk_size (int, optional): The number of iterations in each chunk. The last chunk may be shorter. Defaults to 10000.
+
+        Yields:
+        tuple: (r_i, stats) where r_i is the np.ndarray of the chunk and stats is the RunningStats of all chunks so far. The same RunningStats object is updated in place between chunks.
+
+        Example:
+            for block, stats in crystal_interaction.sim_single_cross_stream(radius=10, concentration=2.5, iterations=1000000, interaction_type='DQ'):
+                print(f"{stats.count} iterations, mean r_i = {stats.mean:.4f}")
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        s = _interaction_exponent(interaction_type)
+        weights = self.site_weights(radius, s, intrinsic)
+        fraction = concentration / 100
+        if np.isscalar(bins):
+            bins = np.linspace(0, weights.sum(), int(bins) + 1)
+        stats = pyet_utils.RunningStats(bins)
+
+        pending = []
+        pending_rows = 0
+        sub_blocks = _uniform_blocks(len(weights), iterations, _seed_sequence(seed))
+        for first, stop, uniform in sub_blocks:
+            pending.append(((uniform < fraction) @ weights)[: stop - first])
+            pending_rows += stop - first
+            while pending_rows >= chunk_size or (stop == iterations and pending_rows):
+                buffer = np.concatenate(pending)
+                r_i = buffer[:chunk_size]
+                pending = [buffer[chunk_size:]]
+                pending_rows = len(pending[0])
+                stats.update(r_i)
+                yield r_i, stats
+
+    def sim_single_cross_adaptive(
+        self,
+        radius: float,
+        concentration: float,
+        interaction_type: Optional[str] = None,
+        tolerance: float = 1e-3,
+        max_iterations: int = 500000,
+        min_iterations: int = 1000,
+        intrinsic: bool = False,
+        u_grid: Optional[np.ndarray] = None,
+        seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
+        check_every: int = 1000,
+    ) -> np.ndarray:
+        """
+        Simulates a single cross-relaxation interaction, running only as many iterations as are needed for the ensemble decay to converge.
+
+        The Monte Carlo is run in chunks of check_every iterations (see sim_single_cross_stream), and after each chunk the running estimate of <exp(-u * r_i)> and its standard error are updated over a grid of u = Cr * t values. The simulation stops at the first check where the largest standard error on the grid is below the tolerance, or when max_iterations is reached. Because <exp(-u * r_i)> is exactly the normalised decay the fit uses, the tolerance is an error bar on the model itself.
+
+        Parameters:
+        radius (float/int): The radius within which to simulate interactions.
+        concentration (float): The concentration of the dopant in % (e.g. 15 for 15%).
+        interaction_type (str): The type of interaction. Can be 'DD', 'DQ', or 'QQ'. This must be set.
+        tolerance (float, optional): The target standard error of the normalised decay. Defaults to 1e-3.
+        max_iterations (int, optional): The largest number of iterations to run. Defaults to 500000.
+        min_iterations (int, optional): The smallest number of iterations before convergence is checked. Defaults to 1000.
+        intrinsic (bool, optional): If True, the interaction components are not scaled by the nearest neighbour distance r0. Defaults to False.
+        u_grid (np.ndarray, optional): The values of Cr * t to monitor. Defaults to 32 log-spaced points spanning 0.01 to 100 times the mean decay time 1 / <r_i>.
+        seed (None, int, SeedSequence or Generator, optional): The seed of the run. A seeded result is identical to the first iterations of sim_single_cross with the same seed. Defaults to None (fresh entropy).
+        check_every (int, optional): The number of iterations between convergence checks, so the run overshoots the point of convergence by less than this. Defaults to 1000.
+
+        Sets:
+        self.convergence (dict): The iterations used, the standard error achieved by the final sample and whether the tolerance was met after at least min_iterations.
+
+        Returns:
+        np.ndarray: The r_i of the iterations that were run.
+        """
+        s = _interaction_exponent(interaction_type)
+        seed_sequence = _seed_sequence(seed)
+        if u_grid is None:
+            weights = self.site_weights(radius, s, intrinsic)
+            mean = max(concentration / 100 * weights.sum(), np.finfo(float).tiny)
+            u_grid = np.logspace(-2, 2, 32) / mean
+        u_grid = np.asarray(u_grid, dtype=np.float64)
+
+        blocks = []
+        first_moment = np.zeros(len(u_grid))
+        second_moment = np.zeros(len(u_grid))
+        n = 0
+
+        def standard_error():
+            if n == 0:
+                return np.inf
+            variance = np.maximum(second_moment / n - (first_moment / n) ** 2, 0)
+            return np.sqrt(variance.max() / n)
+
+        stream = self.sim_single_cross_stream(
+            radius,
+            concentration,
+            max_iterations,
+            interaction_type,
+            intrinsic,
+            seed=seed_sequence,
+            chunk_size=check_every,
+        )
+        for block, _ in stream:
+            blocks.append(block)
+            decay = np.exp(-np.outer(block, u_grid))
+            first_moment += decay.sum(axis=0)
+            second_moment += (decay**2).sum(axis=0)
+            n += len(block)
+            if n >= min_iterations and standard_error() <= tolerance:
+                break
 
-                    r_tmp = np.sum(np.power((tmp / distances), s))
-                    r_i[i] = r_tmp
+        # the error achieved, also if the run ended before the first check
+        error = standard_error()
+        self.convergence = {
+            "iterations": n,
+            "error": float(error),
+            "converged": bool(error <= tolerance and n >= min_iterations),
+        }
+        if self.convergence["converged"]:
+            print(f"Simulator: converged to {error:.2e} after {n} iterations")
+        else:
+            print(
+                f"Simulator: reached max_iterations={n} with error {error:.2e} "
+                f"(tolerance {tolerance:.2e})"
+            )
+        r_i = np.concatenate(blocks)
+        pyet_utils.cache_writer(
+            r_i,
+            **self._cache_params(radius, concentration, n, interaction_type, intrinsic),
+            seed=_seed_record(seed_sequence),
+            generator="numpy",
+        )
+        return r_i
 
+    def sweep(
+        self,
+        radius: float,
+        concentrations: List[float],
+        iterations: int,
+        interaction_type: Optional[str] = None,
+        intrinsic: bool = False,
+        seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
+    ) -> dict:
+        """
+        Simulates a single cross-relaxation interaction at several concentrations in one pass.
+
+        The candidate sites and their weights are computed once, and every block of iterations draws a single uniform matrix that is thresholded at each concentration (common random numbers). This is cheaper than separate simulations, and because each concentration sees the same random numbers, trends across concentrations are much smoother. The result for each concentration is identical to sim_single_cross with the same seed and is cached under its own entry. With a seed, only concentrations that are not already cached with that seed are simulated. Without a seed, cached entries may come from unrelated runs, so every concentration is simulated together.
+
+        Parameters:
+        radius (float/int): The radius within which to simulate interactions.
+        concentrations (list): The concentrations of the dopant in % (e.g. [0.5, 1, 2.5, 5, 10]).
+        iterations (int): The number of iterations to run the simulation.
+        interaction_type (str): The type of interaction. Can be 'DD', 'DQ', or 'QQ'. This must be set.
+        intrinsic (bool, optional): If True, the interaction components are not scaled by the nearest neighbour distance r0. Defaults to False.
+        seed (None, int, SeedSequence or Generator, optional): The seed of the sweep. Defaults to None (fresh entropy, and the cache is not read).
+
+        Returns:
+        dict: The read-only r_i array of each concentration, keyed by concentration.
+
+        Example:
+            components = crystal_interaction.sweep(radius=10, concentrations=[2.5, 5, 10], iterations=50000, interaction_type='DQ')
+            components[2.5]
+        """
+        s = _interaction_exponent(interaction_type)
+        seed_sequence = _seed_sequence(seed)
+        seed_record = _seed_record(seed_sequence)
+        seed_params = (
+            {} if seed is None else {"seed": seed_record, "generator": "numpy"}
+        )
+        cache_params = {
+            c: self._cache_params(radius, c, iterations, interaction_type, intrinsic)
+            for c in concentrations
+        }
+
+        results = dict.fromkeys(concentrations)
+        if seed is not None:
+            # cached entries with this seed share its random numbers
+            for concentration in concentrations:
+                results[concentration] = pyet_utils.cache_reader(
+                    **cache_params[concentration], **seed_params
+                )
+        missing = [c for c in concentrations if results[c] is None]
+        if missing:
+            print(f"Simulator: simulating concentrations {missing}")
+            weights = self.site_weights(radius, s, intrinsic)
+            fractions = np.asarray(missing) / 100
+            r_i = np.zeros((len(missing), iterations))
+            sub_blocks = _uniform_blocks(len(weights), iterations, seed_sequence)
+            for first, stop, uniform in sub_blocks:
+                for k, fraction in enumerate(fractions):
+                    values = (uniform < fraction) @ weights
+                    r_i[k, first:stop] = values[: stop - first]
+
+            r_i.flags.writeable = False
+            for k, concentration in enumerate(missing):
+                results[concentration] = r_i[k]
                 pyet_utils.cache_writer(
-                    r_i,
-                    sourcefile=self.structure.filename,
-                    process=process,
-                    radius=radius,
-                    concentration=concentration,
-                    iterations=iterations,
-                    interaction_type=interaction_type,
-                    intrinsic=intrinsic,
+                    r_i[k],
+                    **cache_params[concentration],
+                    seed=seed_record,
+                    generator="numpy",
                 )
-            case _:
-                r_i = cache_data
+        return results
 
-        return r_i
+    def sim_multipole(
+        self,
+        radius: float,
+        concentration: float,
+        iterations: int,
+        interaction_types: List[Union[str, float]] = ("DD", "DQ", "QQ"),
+        intrinsic: bool = False,
+        seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
+    ) -> dict:
+        """
+        Simulates a single cross-relaxation interaction for several multipolar interaction types in one pass.
+
+        The doping configurations do not depend on the distance exponent s, so every block of iterations draws one occupancy matrix and projects it onto the weights of each requested interaction type in turn. The result for each interaction type is identical to sim_single_cross with the same seed and is cached under its own entry. With a seed, only interaction types that are not already cached with that seed are simulated. Without a seed, cached entries may come from unrelated runs, so every interaction type is simulated together.
+
+        Parameters:
+        radius (float/int): The radius within which to simulate interactions.
+        concentration (float): The concentration of the dopant in % (e.g. 15 for 15%).
+        iterations (int): The number of iterations to run the simulation.
+        interaction_types (list, optional): The interaction types to simulate. Each is 'DD', 'DQ', 'QQ' or a numeric distance exponent s (e.g. 12). Types with the same exponent (e.g. 8 and 'DQ') are simulated once and get the same array. Defaults to ('DD', 'DQ', 'QQ').
+        intrinsic (bool, optional): If True, the interaction components are not scaled by the nearest neighbour distance r0. Defaults to False.
+        seed (None, int, SeedSequence or Generator, optional): The seed of the simulation. Defaults to None (fresh entropy, and the cache is not read).
+
+        Returns:
+        dict: The read-only r_i array of each interaction type, keyed by interaction type.
+
+        Example:
+            components = crystal_interaction.sim_multipole(radius=10, concentration=2.5, iterations=50000)
+            components['DQ']
+        """
+        exponents = {t: _multipole_exponent(t) for t in interaction_types}
+        # types with the same exponent (e.g. 8 and 'DQ') share one simulation and cache entry
+        labels = {}
+        for interaction_type, s in exponents.items():
+            labels.setdefault(s, interaction_type)
+        seed_sequence = _seed_sequence(seed)
+        seed_record = _seed_record(seed_sequence)
+        seed_params = (
+            {} if seed is None else {"seed": seed_record, "generator": "numpy"}
+        )
+        cache_params = {
+            s: self._cache_params(radius, concentration, iterations, t, intrinsic)
+            for s, t in labels.items()
+        }
+
+        components = dict.fromkeys(labels)
+        if seed is not None:
+            # cached entries with this seed share its doping configurations
+            for s in labels:
+                components[s] = pyet_utils.cache_reader(
+                    **cache_params[s], **seed_params
+                )
+        missing = [s for s in labels if components[s] is None]
+        if missing:
+            print(
+                f"Simulator: simulating interaction types {[labels[s] for s in missing]}"
+            )
+            weights = [self.site_weights(radius, s, intrinsic) for s in missing]
+            fraction = concentration / 100
+            r_i = np.zeros((len(missing), iterations))
+            sub_blocks = _uniform_blocks(len(weights[0]), iterations, seed_sequence)
+            for first, stop, uniform in sub_blocks:
+                occupied = (uniform < fraction).astype(np.float64)
+                for k, type_weights in enumerate(weights):
+                    r_i[k, first:stop] = (occupied @ type_weights)[: stop - first]
+
+            r_i.flags.writeable = False
+            for k, s in enumerate(missing):
+                components[s] = r_i[k]
+                pyet_utils.cache_writer(
+                    components[s],
+                    **cache_params[s],
+                    seed=seed_record,
+                    generator="numpy",
+                )
+        return {t: components[s] for t, s in exponents.items()}
+
+    def shell_model(
+        self,
+        radius: float,
+        concentration: float,
+        interaction_type: Optional[str] = None,
+        intrinsic: bool = False,
+    ) -> pyet_utils.ShellDistribution:
+        """
+        Describes the single cross-relaxation interaction with the shell model instead of Monte Carlo. Same-species sites are grouped into shells of equal distance from the central ion, and the ensemble decay is then computed exactly from the shell radii and multiplicities.
+
+        Parameters:
+        radius (float/int): The radius within which to include shells.
+        concentration (float): The concentration of the dopant in % (e.g. 15 for 15%).
+        interaction_type (str): The type of interaction. Can be 'DD', 'DQ', or 'QQ'. This must be set.
+        intrinsic (bool, optional): If True, the weights are not scaled by the nearest neighbour distance r0. Defaults to False.
+
+        Returns:
+        ShellDistribution: The shells, which can be used as the radial data of a Trace and fitted with Optimiser(model='shell').
+
+        Example:
+            shells = crystal_interaction.shell_model(radius=20, concentration=2.5, interaction_type='DQ')
+            decay = shells.laplace(cr * time)
+        """
+        s = _interaction_exponent(interaction_type)
+        weights = self.site_weights(radius, s, intrinsic)
+        distances = self.filtered_coords["r"].to_numpy()
+        # symmetry-equivalent sites agree to far better than a micro-Angstrom
+        radii, shell, multiplicity = np.unique(
+            np.round(distances, 6), return_inverse=True, return_counts=True
+        )
+        shell_weights = np.bincount(shell, weights=weights) / multiplicity
+        return pyet_utils.ShellDistribution(
+            radii, multiplicity, shell_weights, concentration
+        )
 
     # TODO add exchange interation and cooperative process as an example
 
@@ -434,6 +1412,7 @@ class Interaction:
         concentration: float,
         dopant: str = "acceptor",
         filter: Optional[List[str]] = None,
+        seed: Union[None, int, np.random.SeedSequence, np.random.Generator] = None,
     ) -> Union[None, Exception]:
         """
         Generates a 3D scatter plot of the structure, with the central ion and its neighbors within a given radius.
@@ -443,10 +1422,12 @@ class Interaction:
         concentration (float): The concentration of the dopant.
         dopant (str, optional): The type of dopant. Defaults to 'acceptor'.
         filter (list, optional): A list of species to plot. If not provided, all species are plotted.
+        seed (None, int, SeedSequence or Generator, optional): The random seed or generator used to dope the structure. Defaults to None (fresh entropy).
 
         Returns:
         None. The function directly plots the 3D structure using matplotlib.
         """
+        from .plotting import Plot, get_colours
 
         concentration = concentration / 100
         coords = self.structure.nearest_neighbours_coords(radius)
@@ -458,9 +1439,9 @@ class Interaction:
             coords.index[coords["species"] == self.structure.centre_ion_species]
         )
 
-        for i in filtered_coords.index:
-            if np.random.rand() < concentration:
-                filtered_coords.loc[i, "species"] = dopant
+        rng = np.random.default_rng(seed)
+        mask = rng.random(len(filtered_coords)) < concentration
+        filtered_coords.loc[mask, "species"] = dopant
 
         frames = [coords, filtered_coords]
 
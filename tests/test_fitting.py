@@ -10,6 +10,7 @@ Covers:
 """
 
 import os
+import tempfile
 import unittest
 from unittest.mock import patch
 
@@ -20,9 +21,18 @@ from pyet_mc.fitting import (
     Optimiser,
     double_exp,
     general_energy_transfer,
+    laplace_energy_transfer,
     use_rust_library,
 )
-from pyet_mc.pyet_utils import Trace
+from pyet_mc.pyet_utils import (
+    LaplaceSurrogate,
+    ShellDistribution,
+    Trace,
+    compress_radial_data,
+)
+
+# CI sets PYET_REQUIRE_RUST, so a missing or broken extension fails there instead of skipping
+run_rust_tests = use_rust_library or bool(os.environ.get("PYET_REQUIRE_RUST"))
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -96,6 +106,56 @@ class TestGeneralEnergyTransfer(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 
+class TestLaplaceEnergyTransfer(unittest.TestCase):
+    """Tests for the transform-based model used with shell distributions."""
+
+    def test_matches_general_model_for_fully_doped_shells(self):
+        # at 100% every site is doped, so every r_i equals sum(n * w)
+        shells = ShellDistribution([4.0, 5.0], [2, 3], [1.0, 0.25], 100)
+        time = np.linspace(0, 5, 50)
+        params = {"amp": 2.0, "cr": 3.0, "rad": 0.4, "offset": 0.1}
+        expected = general_energy_transfer(time, np.array([2.75]), params)
+        np.testing.assert_allclose(
+            laplace_energy_transfer(time, shells, params), expected
+        )
+
+    def test_shell_model_option(self):
+        shells = ShellDistribution([4.0], [6], [1.0], 10)
+        time = np.linspace(0, 5, 20)
+        trace = Trace(np.ones(20), time, "shell", shells)
+        opt = Optimiser([trace], [["amp", "cr", "rad", "offset"]], model="shell")
+        self.assertIs(opt.model, laplace_energy_transfer)
+
+
+class TestCompressedRadialData(unittest.TestCase):
+    """Tests for fitting with compressed radial data."""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        occupied = rng.binomial(1, 0.05, (20000, 60))
+        self.radial = occupied @ rng.uniform(0, 1, 60) ** 4
+        self.time = np.linspace(0, 10, 200)
+        self.params = {"amp": 1.0, "cr": 5.0, "rad": 0.2, "offset": 0.01}
+
+    def test_general_model_within_tolerance(self):
+        compressed = compress_radial_data(self.radial, tolerance=1e-4)
+        self.assertLess(len(compressed), len(self.radial) // 50)
+        np.testing.assert_allclose(
+            general_energy_transfer(self.time, compressed, self.params),
+            general_energy_transfer(self.time, self.radial, self.params),
+            atol=1e-4,
+        )
+
+    def test_trace_compression(self):
+        trace = Trace(
+            np.ones(200), self.time, "compressed", self.radial, compression=1e-3
+        )
+        self.assertLessEqual(trace.radial_data.error, 1e-3)
+        opt = Optimiser([trace], [["amp", "cr", "rad", "offset"]], model="rs")
+        result = opt.model(self.time, trace.radial_data, self.params)
+        self.assertEqual(len(result), 200)
+
+
 class TestDoubleExp(unittest.TestCase):
     """Tests for the double_exp model function."""
 
@@ -133,7 +193,7 @@ class TestDoubleExp(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 
-@unittest.skipUnless(use_rust_library, "Rust bindings not available")
+@unittest.skipUnless(run_rust_tests, "Rust bindings not available")
 class TestRustWrappers(unittest.TestCase):
     """Verify that Rust wrappers produce identical results to the Python model."""
 
@@ -143,6 +203,23 @@ class TestRustWrappers(unittest.TestCase):
         self._rust_seq = _rust_energy_transfer
         self._rust_par = _rust_energy_transfer_para
 
+    def test_extension_is_loaded(self):
+        self.assertTrue(use_rust_library)
+
+    def test_wrappers_accept_memory_mapped_cache_entries(self):
+        time = np.linspace(0.01, 10, 100)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "r_i.npy")
+            np.save(path, np.random.default_rng(5).uniform(0.1, 4.0, size=500))
+            radial = np.load(path, mmap_mode="r")
+            params = {"amp": 1.5, "cr": 20.0, "rad": 0.3, "offset": 0.05}
+            expected = general_energy_transfer(time, np.array(radial), params)
+            for wrapper in (self._rust_seq, self._rust_par):
+                np.testing.assert_allclose(
+                    wrapper(time, radial, params), expected, rtol=1e-10
+                )
+            del radial
+
     def test_sequential_matches_python(self):
         time = np.linspace(0.01, 10, 100)
         radial = np.array([0.5, 1.0, 2.0, 3.5])
@@ -174,6 +251,18 @@ class TestRustWrappers(unittest.TestCase):
         self.assertIsInstance(self._rust_seq(time, radial, params), np.ndarray)
         self.assertIsInstance(self._rust_par(time, radial, params), np.ndarray)
 
+    def test_wrapper_accepts_read_only_and_strided_arrays(self):
+        time = np.linspace(0, 5, 200)[::2]
+        radial = np.random.default_rng(3).uniform(0.1, 4.0, size=100)
+        radial.flags.writeable = False
+        params = {"amp": 2.0, "cr": 100.0, "rad": 1.0, "offset": 0.0}
+        expected = general_energy_transfer(time, radial, params)
+        np.testing.assert_allclose(self._rust_seq(time, radial, params), expected)
+        np.testing.assert_allclose(
+            self._rust_par(list(time), radial.astype(np.float32), params),
+            general_energy_transfer(time, radial.astype(np.float32), params),
+        )
+
 
 # ---------------------------------------------------------------------------
 # Optimiser construction
@@ -197,7 +286,7 @@ class TestOptimiserInit(unittest.TestCase):
         opt = Optimiser([t], [["amp", "cr", "rad", "offset"]], auto_weights=False)
         self.assertIs(opt.model, general_energy_transfer)
 
-    @unittest.skipUnless(use_rust_library, "Rust bindings not available")
+    @unittest.skipUnless(run_rust_tests, "Rust bindings not available")
     def test_rs_model(self):
         from pyet_mc.fitting import _rust_energy_transfer_para
 
@@ -207,7 +296,7 @@ class TestOptimiserInit(unittest.TestCase):
         )
         self.assertIs(opt.model, _rust_energy_transfer_para)
 
-    @unittest.skipUnless(use_rust_library, "Rust bindings not available")
+    @unittest.skipUnless(run_rust_tests, "Rust bindings not available")
     def test_rs_single_model(self):
         from pyet_mc.fitting import _rust_energy_transfer
 
@@ -263,6 +352,18 @@ class TestWrss(unittest.TestCase):
         bad_params = {"amp": 2.0, "cr": 5.0, "rad": 1.0, "offset": 0.5}
         self.assertGreater(opt.wrss(bad_params), 0)
 
+    def test_wrss_surrogate_matches_python(self):
+        time, radial, y, params = _make_synthetic_data()
+        t = Trace(y, time, "data", radial)
+        exact = Optimiser([t], [list(params)], auto_weights=False)
+        surrogate = Optimiser(
+            [t], [list(params)], auto_weights=False, model="surrogate"
+        )
+        self.assertIsInstance(surrogate.surrogates[0], LaplaceSurrogate)
+        self.assertAlmostEqual(
+            surrogate.wrss(params), exact.wrss(params), delta=1e-4 * exact.wrss(params)
+        )
+
     def test_wrss_custom_model(self):
         """wrss works with a custom model via the single code path."""
 
@@ -280,7 +381,7 @@ class TestWrss(unittest.TestCase):
         expected = 20 * 1.0**2  # weight=1, 20 points, each residual=1
         self.assertAlmostEqual(opt.wrss({"c": 4.0}), expected, places=10)
 
-    @unittest.skipUnless(use_rust_library, "Rust bindings not available")
+    @unittest.skipUnless(run_rust_tests, "Rust bindings not available")
     def test_wrss_rust_model_same_as_python(self):
         """Rust and Python models should give identical wrss for the same params."""
         time = np.linspace(0.01, 5, 80)
@@ -1,7 +1,53 @@
 """Tests for pyet_mc top-level public API re-exports."""
 
+import importlib
+import json
+import os
+import subprocess
+import sys
 import unittest
 
+# Modules that only the structure and plotting code needs. A headless fitting
+# process must be able to start without any of them.
+HEAVY_MODULES = ["pymatgen", "plotly", "webview", "pandas", "matplotlib"]
+
+# Budget in seconds for the time spent in pyet_mc's own modules (excluding the
+# libraries they import), far above the few tens of milliseconds they take today.
+OWN_IMPORT_BUDGET = 0.5
+
+
+def _import_report(statement):
+    """Run an import in a fresh interpreter with -X importtime and report which heavy
+    modules it loaded and how long pyet_mc's own modules took to import."""
+    code = (
+        "import json, sys\n"
+        f"{statement}\n"
+        f"heavy = sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)\n"
+        "print(json.dumps(heavy))\n"
+    )
+    env = dict(os.environ)
+    src = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    own = 0
+    for line in out.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or len(fields) != 3:
+            continue
+        name = fields[2].strip()
+        if name == "pyet_mc" or name.startswith("pyet_mc."):
+            own += int(fields[0].split(":")[1])
+    return {
+        "heavy": json.loads(out.stdout.strip().splitlines()[-1]),
+        "seconds": own / 1e6,
+    }
+
 
 class TestPublicAPI(unittest.TestCase):
     """Verify that all advertised symbols are importable from the top-level package."""
@@ -71,5 +117,27 @@ class TestPublicAPI(unittest.TestCase):
             self.assertTrue(callable(fn))
 
 
+class TestImportWeight(unittest.TestCase):
+    """Import regression checks: importing the package or the fitting API must not load
+    the heavy modules, and pyet_mc's own modules must stay within OWN_IMPORT_BUDGET."""
+
+    def test_import_package_is_lightweight(self):
+        report = _import_report("import pyet_mc")
+        self.assertListEqual(report["heavy"], [])
+        self.assertLess(report["seconds"], OWN_IMPORT_BUDGET)
+
+    def test_import_fitting_api_is_lightweight(self):
+        report = _import_report("from pyet_mc import Optimiser, Trace")
+        self.assertListEqual(report["heavy"], [])
+        self.assertGreater(report["seconds"], 0)
+        self.assertLess(report["seconds"], OWN_IMPORT_BUDGET)
+
+    def test_submodules_are_attributes_on_first_access(self):
+        import pyet_mc
+
+        self.assertIs(pyet_mc.fitting, importlib.import_module("pyet_mc.fitting"))
+        self.assertIs(pyet_mc.pyet_utils, importlib.import_module("pyet_mc.pyet_utils"))
+
+
 if __name__ == "__main__":
     unittest.main()
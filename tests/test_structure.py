@@ -1,11 +1,31 @@
+import json
 import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
+import unittest.mock
 from typing import List, Optional
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
-from pyet_mc.structure import Structure
+from pyet_mc import pyet_utils
+from pyet_mc import structure as structure_module
+from pyet_mc.structure import (
+    Interaction,
+    NeighbourTable,
+    Structure,
+    _batched_r_i,
+    sim_single_cross_rs,
+)
+
+# CI sets PYET_REQUIRE_RUST, so a missing or broken extension fails there instead of skipping
+run_rust_tests = sim_single_cross_rs is not None or bool(
+    os.environ.get("PYET_REQUIRE_RUST")
+)
 
 
 class TestClass(unittest.TestCase):
@@ -18,6 +38,7 @@ class TestClass(unittest.TestCase):
         cif_file = os.path.join(cif_dir, "KY3F10_mp-2943_conventional_standard.cif")
         # Create an instance of Structure with the dummy CIF file
 
+        self.cif_file = cif_file
         self.obj = Structure(cif_file)
         self.obj.centre_ion("Y")
 
@@ -38,6 +59,64 @@ class TestClass(unittest.TestCase):
         # Check that the DataFrame has the expected columns
         self.assertListEqual(list(result.columns), ["r", "theta", "phi", "species"])
 
+    def test_neighbour_table_matches_pymatgen(self):
+        # The vectorised table must agree with pymatgen's per-site neighbour list
+        table = self.obj.neighbour_table(8.0)
+        self.assertIsInstance(table, NeighbourTable)
+        neighbours = self.obj.struct.get_neighbors(self.obj.site, 8.0)
+        self.assertEqual(len(table), len(neighbours))
+        np.testing.assert_allclose(
+            np.sort(table.r), np.sort([n.nn_distance for n in neighbours])
+        )
+        self.assertListEqual(
+            sorted(table.species), sorted(n.species_string for n in neighbours)
+        )
+
+    def test_native_engine_matches_pymatgen(self):
+        native = Structure(self.cif_file, neighbour_engine="native")
+        native.centre_ion("Y")
+        expected = self.obj.neighbour_table(12.0)
+        result = native.neighbour_table(12.0)
+        self.assertEqual(len(result), len(expected))
+        order_expected = np.lexsort(expected.xyz.T[::-1])
+        order_result = np.lexsort(result.xyz.T[::-1])
+        np.testing.assert_allclose(
+            result.xyz[order_result], expected.xyz[order_expected], atol=1e-8
+        )
+        np.testing.assert_array_equal(
+            result.species[order_result], expected.species[order_expected]
+        )
+
+    def test_neighbour_table_memo_slices_larger_search(self):
+        # centre_ion already searched 50 Angstroms, so smaller radii must not search again
+        with unittest.mock.patch.object(
+            self.obj, "_search_neighbours", wraps=self.obj._search_neighbours
+        ) as search:
+            table = self.obj.neighbour_table(9.0)
+            search.assert_not_called()
+        self.assertTrue(np.all(np.diff(table.r) >= 0))
+        self.assertLessEqual(table.r.max(), 9.0)
+        fresh = self.obj._search_neighbours(9.0)
+        np.testing.assert_allclose(table.r, np.sort(fresh.r))
+
+    def test_neighbour_table_memo_cleared_by_centre_ion(self):
+        self.obj.neighbour_table(60.0)
+        self.assertEqual(self.obj._neighbour_memo[0], 60.0)
+        self.obj.centre_ion("K")
+        self.assertEqual(self.obj._neighbour_memo[0], 50)
+        self.assertTrue(
+            np.allclose(self.obj.neighbour_table(5.0).origin, self.obj.origin)
+        )
+
+    def test_neighbour_table_arrays(self):
+        table = self.obj.neighbour_table(8.0)
+        self.assertEqual(table.xyz.shape, (len(table), 3))
+        self.assertTrue(table.xyz.flags["C_CONTIGUOUS"])
+        self.assertEqual(table.r.dtype, np.float64)
+        self.assertTrue(np.issubdtype(table.species_codes.dtype, np.integer))
+        mask = table.species_mask("Y")
+        self.assertTrue(np.all(table.subset(mask).species == "Y"))
+
     def test_structure_plot(self):
         # Call the method with a test radius and filter
         try:
@@ -61,5 +140,534 @@ class TestClass(unittest.TestCase):
             self.obj.structure_plot(5.0, filter=["R", "F"])
 
 
+class TestStructureCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        patcher = unittest.mock.patch.object(pyet_utils, "cache_dir", self.tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cif_file = os.path.abspath(
+            os.path.join(
+                os.path.dirname(__file__),
+                "..",
+                "src",
+                "cif_files",
+                "KY3F10_mp-2943_conventional_standard.cif",
+            )
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_cached_structure_matches_parsed(self):
+        parsed = Structure(self.cif_file, cache=True)
+        entry = os.path.join(self.tmpdir, "structures", f"{parsed.cif_hash}.npz")
+        self.assertTrue(os.path.isfile(entry))
+
+        cached = Structure(self.cif_file, cache=True)
+        # the CIF is only parsed again if the parser itself is requested
+        self.assertIsNone(cached._cif)
+        self.assertEqual(cached.struct, parsed.struct)
+        self.assertListEqual(
+            [site.species_string for site in cached.struct],
+            [site.species_string for site in parsed.struct],
+        )
+
+    def test_cached_neighbour_table_is_reused(self):
+        first = Structure(self.cif_file, cache=True)
+        first.centre_ion("Y")
+        second = Structure(self.cif_file, cache=True)
+        with unittest.mock.patch.object(
+            second, "_search_neighbours", wraps=second._search_neighbours
+        ) as search:
+            second.centre_ion("Y")
+            search.assert_not_called()
+        self.assertEqual(second.r0, first.r0)
+        np.testing.assert_allclose(
+            second.neighbour_table(10.0).r, first.neighbour_table(10.0).r
+        )
+
+    def test_unwritable_cache_is_skipped(self):
+        with unittest.mock.patch.object(
+            pyet_utils.os, "makedirs", side_effect=PermissionError("read-only")
+        ):
+            structure = Structure(self.cif_file, cache=True)
+            structure.centre_ion("Y")
+        self.assertGreater(len(structure.neighbour_table(10.0).r), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "structures")))
+
+    def test_cache_disabled_by_default(self):
+        Structure(self.cif_file)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, "structures")))
+
+
+class TestInteractionMonteCarlo(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cif_file = os.path.abspath(
+            os.path.join(
+                os.path.dirname(__file__),
+                "..",
+                "src",
+                "cif_files",
+                "KY3F10_mp-2943_conventional_standard.cif",
+            )
+        )
+        cls.cif_file = cif_file
+        structure = Structure(cif_file)
+        structure.centre_ion("Y")
+        cls.interaction = Interaction(structure)
+
+    def setUp(self):
+        # keep simulations out of the real cache
+        self.tmpdir = tempfile.mkdtemp()
+        patcher = unittest.mock.patch.object(pyet_utils, "cache_dir", self.tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_batch_engine_matches_loop_engine(self):
+        # both engines draw the same block streams in the same order
+        loop = self.interaction.sim_single_cross(
+            8, 10, 200, "DQ", engine="loop", seed=7
+        )
+        shutil.rmtree(self.tmpdir)
+        os.makedirs(self.tmpdir)
+        batch = self.interaction.sim_single_cross(
+            8, 10, 200, "DQ", engine="batch", seed=7
+        )
+        np.testing.assert_allclose(batch, loop)
+
+    def test_results_are_read_only_on_hit_and_miss(self):
+        simulated = self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=2)
+        cached = self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=2)
+        corrected = self.interaction.sim_single_cross(
+            8, 10, 300, "DQ", seed=2, tail_correction=True
+        )
+        swept = self.interaction.sweep(8, [5], 300, "DQ", seed=4)
+        for r_i in (simulated, cached, corrected, swept[5]):
+            self.assertFalse(r_i.flags.writeable)
+            with self.assertRaises(ValueError):
+                r_i *= 2
+
+    def test_loop_and_batch_entries_are_kept_apart(self):
+        loop = self.interaction.sim_single_cross(
+            8, 10, 300, "DQ", engine="loop", seed=7
+        )
+        with unittest.mock.patch.object(
+            structure_module, "_batched_r_i", wraps=structure_module._batched_r_i
+        ) as batched:
+            batch = self.interaction.sim_single_cross(
+                8, 10, 600, "DQ", engine="batch", seed=7
+            )
+            again = self.interaction.sim_single_cross(
+                8, 10, 300, "DQ", engine="batch", seed=7
+            )
+        # the loop entry is neither served nor extended by the batch engine
+        self.assertEqual(batched.call_args.kwargs.get("start", 0), 0)
+        self.assertEqual(batched.call_count, 1)
+        np.testing.assert_array_equal(again, batch[:300])
+        cached_loop = self.interaction.sim_single_cross(
+            8, 10, 300, "DQ", engine="loop", seed=7
+        )
+        np.testing.assert_array_equal(cached_loop, loop)
+
+    def test_seeded_runs_are_reproducible(self):
+        first = self.interaction.sim_single_cross(8, 10, 500, "DQ", seed=3)
+        shutil.rmtree(self.tmpdir)
+        os.makedirs(self.tmpdir)
+        second = self.interaction.sim_single_cross(8, 10, 500, "DQ", seed=3)
+        np.testing.assert_array_equal(first, second)
+
+    def test_seeded_lookup_ignores_other_seeds(self):
+        first = self.interaction.sim_single_cross(8, 10, 500, "DQ", seed=3)
+        other = self.interaction.sim_single_cross(8, 10, 500, "DQ", seed=4)
+        self.assertFalse(np.array_equal(first, other))
+        cached = self.interaction.sim_single_cross(8, 10, 500, "DQ", seed=3)
+        np.testing.assert_array_equal(first, cached)
+
+    def test_seed_is_recorded_in_cache(self):
+        self.interaction.sim_single_cross(8, 10, 50, "DQ", seed=12345)
+        (entry,) = [f for f in os.listdir(self.tmpdir) if f.endswith(".json")]
+        with open(os.path.join(self.tmpdir, entry)) as f:
+            record = json.load(f)["seed"]
+        self.assertEqual(record, {"entropy": 12345, "spawn_key": []})
+
+    def test_block_streams_are_independent_of_iteration_count(self):
+        # a shorter seeded run is an exact prefix of a longer one
+        weights = self.interaction.site_weights(8, 8)
+        short = _batched_r_i(weights, 10, 100, np.random.SeedSequence(5))
+        long = _batched_r_i(weights, 10, 300, np.random.SeedSequence(5))
+        np.testing.assert_array_equal(short, long[:100])
+
+    def test_generator_seed_advances(self):
+        rng = np.random.default_rng(1)
+        self.interaction.distance_sim(8)
+        first = self.interaction.doper(50, seed=rng, return_coords=True)
+        second = self.interaction.doper(50, seed=rng, return_coords=True)
+        self.assertFalse(first.species.equals(second.species))
+
+    def test_site_weights(self):
+        weights = self.interaction.site_weights(8, 6)
+        r = self.interaction.filtered_coords["r"].to_numpy()
+        np.testing.assert_allclose(weights, (self.interaction.structure.r0 / r) ** 6)
+        np.testing.assert_allclose(
+            self.interaction.site_weights(8, 6, intrinsic=True), r**-6.0
+        )
+
+    @unittest.skipUnless(run_rust_tests, "Rust bindings not available")
+    def test_rust_kernel_is_seed_deterministic(self):
+        distances = np.array([4.0, 5.0, 6.0, 7.0])
+        first = sim_single_cross_rs(distances, 0.3, 8.0, 4.0, 5000, 42)
+        second = sim_single_cross_rs(distances, 0.3, 8.0, 4.0, 5000, 42)
+        self.assertIsInstance(first, np.ndarray)
+        np.testing.assert_array_equal(first, second)
+        self.assertFalse(
+            np.array_equal(
+                first, sim_single_cross_rs(distances, 0.3, 8.0, 4.0, 5000, 43)
+            )
+        )
+
+    @unittest.skipUnless(run_rust_tests, "Rust bindings not available")
+    def test_rust_engine_matches_batch_at_full_occupancy(self):
+        # every site is doped, so both engines must return sum(weights) exactly
+        rs = self.interaction.sim_single_cross(8, 100, 3000, "DQ", engine="rs")
+        batch = self.interaction.sim_single_cross(8, 100, 3000, "DQ", engine="batch")
+        np.testing.assert_allclose(rs, batch, rtol=1e-12)
+        np.testing.assert_allclose(
+            rs, self.interaction.site_weights(8, 8).sum(), rtol=1e-12
+        )
+
+    @unittest.skipUnless(run_rust_tests, "Rust bindings not available")
+    def test_rust_engine_matches_batch_statistically(self):
+        rs = self.interaction.sim_single_cross(8, 10, 20000, "DQ", engine="rs")
+        weights = self.interaction.site_weights(8, 8)
+        # the expected r_i is c * sum(weights); its standard error over 20000 draws is small
+        expected = 0.1 * weights.sum()
+        stderr = np.sqrt(0.1 * 0.9 * np.sum(weights**2) / 20000)
+        self.assertEqual(len(rs), 20000)
+        self.assertLess(abs(rs.mean() - expected), 5 * stderr)
+
+    def test_adaptive_stops_at_tolerance(self):
+        r_i = self.interaction.sim_single_cross_adaptive(
+            8, 10, "DQ", tolerance=5e-3, max_iterations=200000, seed=4
+        )
+        report = self.interaction.convergence
+        self.assertTrue(report["converged"])
+        self.assertLessEqual(report["error"], 5e-3)
+        self.assertEqual(len(r_i), report["iterations"])
+        self.assertLess(report["iterations"], 200000)
+
+    def test_adaptive_reports_error_of_short_runs(self):
+        u_grid = np.logspace(-1, 1, 8)
+        r_i = self.interaction.sim_single_cross_adaptive(
+            8,
+            10,
+            "DQ",
+            max_iterations=500,
+            min_iterations=1000,
+            u_grid=u_grid,
+            seed=4,
+        )
+        report = self.interaction.convergence
+        self.assertEqual(report["iterations"], 500)
+        self.assertFalse(report["converged"])
+        decay = np.exp(-np.outer(r_i, u_grid))
+        expected = np.sqrt(np.max(decay.var(axis=0)) / len(r_i))
+        self.assertAlmostEqual(report["error"], expected, places=12)
+
+    def test_adaptive_stops_before_first_block_boundary(self):
+        # at 10 A a block holds tens of thousands of iterations
+        n_sites = len(self.interaction.site_weights(10, 8))
+        block = structure_module._block_rows(n_sites)
+        stopped = []
+        for tolerance in (1e-1, 1e-2, 3e-3):
+            self.interaction.sim_single_cross_adaptive(
+                10, 2.5, "DQ", tolerance=tolerance, seed=4
+            )
+            self.assertTrue(self.interaction.convergence["converged"])
+            stopped.append(self.interaction.convergence["iterations"])
+        self.assertEqual(stopped[0], 1000)
+        self.assertLess(stopped[0], stopped[1])
+        self.assertLess(stopped[1], stopped[2])
+        self.assertLess(stopped[2], block)
+        self.assertTrue(all(n % 1000 == 0 for n in stopped))
+
+    def test_adaptive_is_prefix_of_seeded_run(self):
+        r_i = self.interaction.sim_single_cross_adaptive(
+            8, 10, "DQ", tolerance=5e-3, seed=4
+        )
+        shutil.rmtree(self.tmpdir)
+        os.makedirs(self.tmpdir)
+        full = self.interaction.sim_single_cross(8, 10, len(r_i), "DQ", seed=4)
+        np.testing.assert_array_equal(r_i, full)
+
+    def test_adaptive_reports_unconverged_runs(self):
+        self.interaction.sim_single_cross_adaptive(
+            8, 10, "DQ", tolerance=1e-9, max_iterations=2000, seed=4
+        )
+        report = self.interaction.convergence
+        self.assertFalse(report["converged"])
+        self.assertEqual(report["iterations"], 2000)
+
+    def test_stream_blocks_match_single_simulation(self):
+        blocks = []
+        for block, stats in self.interaction.sim_single_cross_stream(
+            8, 10, 300, "DQ", seed=6
+        ):
+            blocks.append(block)
+        streamed = np.concatenate(blocks)
+        self.assertEqual(stats.count, 300)
+        self.assertEqual(stats.histogram.sum(), 300)
+        self.assertAlmostEqual(stats.mean, streamed.mean())
+        single = self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=6)
+        np.testing.assert_array_equal(streamed, single)
+
+    def test_stream_chunks_match_single_simulation(self):
+        # small blocks that are not a multiple of the sub-block size
+        n_sites = len(self.interaction.site_weights(8, 8))
+        with unittest.mock.patch.object(
+            structure_module, "_MAX_CHUNK_ELEMENTS", n_sites * 1500
+        ):
+            single = self.interaction.sim_single_cross(8, 10, 4000, "DQ", seed=6)
+            for chunk_size in (1, 7, 1000, 1024, 5000):
+                chunks = [
+                    chunk.copy()
+                    for chunk, _ in self.interaction.sim_single_cross_stream(
+                        8, 10, 4000, "DQ", seed=6, chunk_size=chunk_size
+                    )
+                ]
+                self.assertTrue(all(len(c) == chunk_size for c in chunks[:-1]))
+                np.testing.assert_array_equal(np.concatenate(chunks), single)
+
+    def test_stream_rejects_empty_chunks(self):
+        with self.assertRaises(ValueError):
+            next(
+                self.interaction.sim_single_cross_stream(8, 10, 10, "DQ", chunk_size=0)
+            )
+
+    def test_same_filename_different_cif_does_not_share_cache(self):
+        self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=5)
+        # same basename, different contents
+        other_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other_dir)
+        other_cif = os.path.join(other_dir, os.path.basename(self.cif_file))
+        with open(self.cif_file) as src, open(other_cif, "w") as dst:
+            dst.write(src.read() + "\n# edited copy\n")
+        structure = Structure(other_cif)
+        structure.centre_ion("Y")
+        other = Interaction(structure)
+        with unittest.mock.patch.object(
+            pyet_utils, "cache_writer", wraps=pyet_utils.cache_writer
+        ) as writer:
+            other.sim_single_cross(8, 10, 300, "DQ", seed=5)
+            self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=5)
+        self.assertEqual(writer.call_count, 1)
+
+    def test_seeded_lookup_distinguishes_generators(self):
+        params = self.interaction._cache_params(8, 10, 300, "DQ", False)
+        pyet_utils.cache_writer(
+            np.zeros(300), **params, seed={"entropy": 1}, generator="rs"
+        )
+        found = pyet_utils.cache_reader(
+            **params, seed={"entropy": 1}, generator="numpy"
+        )
+        self.assertIsNone(found)
+
+    def test_smaller_request_is_served_from_larger_entry(self):
+        self.interaction.sim_single_cross(8, 10, 600, "DQ", seed=3)
+        with unittest.mock.patch.object(
+            pyet_utils, "cache_writer", wraps=pyet_utils.cache_writer
+        ) as writer:
+            prefix = self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=3)
+        self.assertEqual(writer.call_count, 0)
+        shutil.rmtree(self.tmpdir)
+        os.makedirs(self.tmpdir)
+        fresh = self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=3)
+        np.testing.assert_array_equal(prefix, fresh)
+
+    def test_larger_request_extends_cached_entry(self):
+        # 1234 falls inside a block, whose first rows must be skipped
+        self.interaction.sim_single_cross(20, 10, 1234, "DQ", seed=3)
+        with unittest.mock.patch.object(
+            structure_module, "_batched_r_i", wraps=structure_module._batched_r_i
+        ) as batched:
+            extended = self.interaction.sim_single_cross(20, 10, 5000, "DQ", seed=3)
+        self.assertEqual(batched.call_args.kwargs["start"], 1234)
+        self.assertEqual(pyet_utils.cache_stats()["entries"], 1)
+        shutil.rmtree(self.tmpdir)
+        os.makedirs(self.tmpdir)
+        fresh = self.interaction.sim_single_cross(20, 10, 5000, "DQ", seed=3)
+        np.testing.assert_array_equal(extended, fresh)
+
+    def test_unseeded_extension_keeps_the_stored_seed(self):
+        self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=5)
+        with unittest.mock.patch.object(
+            pyet_utils, "cache_writer", wraps=pyet_utils.cache_writer
+        ) as writer:
+            self.interaction.sim_single_cross(8, 10, 700, "DQ")
+        stored = structure_module._seed_record(structure_module._seed_sequence(5))
+        self.assertEqual(writer.call_args.kwargs["seed"], stored)
+
+    def test_unseeded_request_extends_cached_entry(self):
+        cached = np.array(self.interaction.sim_single_cross(8, 10, 300, "DQ"))
+        extended = self.interaction.sim_single_cross(8, 10, 700, "DQ")
+        np.testing.assert_array_equal(extended[:300], cached)
+        self.assertEqual(len(extended), 700)
+
+    def test_concurrent_request_waits_for_running_simulation(self):
+        real = structure_module._batched_r_i
+        running = threading.Event()
+
+        def slow_batched_r_i(*args, **kwargs):
+            running.set()
+            time.sleep(0.3)
+            return real(*args, **kwargs)
+
+        results = {}
+        with unittest.mock.patch.object(
+            structure_module, "_batched_r_i", side_effect=slow_batched_r_i
+        ) as batched:
+            first = threading.Thread(
+                target=lambda: results.setdefault(
+                    "first", self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=5)
+                )
+            )
+            first.start()
+            running.wait()
+            second = self.interaction.sim_single_cross(8, 10, 300, "DQ", seed=5)
+            first.join()
+        self.assertEqual(batched.call_count, 1)
+        np.testing.assert_array_equal(second, results["first"])
+
+    def test_multipole_matches_single_simulations(self):
+        components = self.interaction.sim_multipole(8, 10, 300, seed=12)
+        self.assertListEqual(list(components), ["DD", "DQ", "QQ"])
+        shutil.rmtree(self.tmpdir)
+        os.makedirs(self.tmpdir)
+        for interaction_type in ("DD", "DQ", "QQ"):
+            single = self.interaction.sim_single_cross(
+                8, 10, 300, interaction_type, seed=12
+            )
+            np.testing.assert_array_equal(components[interaction_type], single)
+
+    def test_multipole_accepts_numeric_exponents(self):
+        components = self.interaction.sim_multipole(
+            8, 10, 300, interaction_types=["DQ", 12], seed=12
+        )
+        weights = self.interaction.site_weights(8, 12)
+        self.assertTrue(np.all(components[12] <= weights.sum()))
+        # same occupancy draws: an empty configuration is empty for every s
+        np.testing.assert_array_equal(components["DQ"] == 0, components[12] == 0)
+
+    def test_multipole_simulates_shared_exponents_once(self):
+        with unittest.mock.patch.object(
+            pyet_utils, "cache_writer", wraps=pyet_utils.cache_writer
+        ) as writer:
+            components = self.interaction.sim_multipole(
+                8, 10, 300, interaction_types=[8, "DQ", "QQ"]
+            )
+        written = [c.kwargs["interaction_type"] for c in writer.call_args_list]
+        self.assertListEqual(written, [8, "QQ"])
+        self.assertListEqual(list(components), [8, "DQ", "QQ"])
+        self.assertIs(components["DQ"], components[8])
+
+    def test_multipole_reuses_cached_types(self):
+        self.interaction.sim_single_cross(8, 10, 300, "DD", seed=12)
+        with unittest.mock.patch.object(
+            pyet_utils, "cache_writer", wraps=pyet_utils.cache_writer
+        ) as writer:
+            self.interaction.sim_multipole(8, 10, 300, ["DD", "QQ"], seed=12)
+        written = [c.kwargs["interaction_type"] for c in writer.call_args_list]
+        self.assertListEqual(written, ["QQ"])
+
+    def test_number_density(self):
+        structure = self.interaction.structure
+        count = sum(site.species_string == "Y" for site in structure.struct)
+        self.assertAlmostEqual(
+            structure.number_density(), count / structure.struct.volume
+        )
+
+    def test_tail_correction_matches_large_radius(self):
+        corrected = self.interaction.sim_single_cross(
+            10, 5, 2000, "DD", seed=3, tail_correction=True
+        )
+        estimate = self.interaction.tail_estimate
+        self.assertGreater(estimate["mean"], 0)
+        self.assertGreater(estimate["std"], 0)
+        expected = 0.05 * self.interaction.site_weights(30, 6).sum()
+        uncorrected = corrected - estimate["mean"]
+        self.assertLess(abs(corrected.mean() - expected), 0.01 * expected)
+        self.assertGreater(abs(uncorrected.mean() - expected), 0.02 * expected)
+
+    def test_tail_correction_is_not_cached(self):
+        corrected = self.interaction.sim_single_cross(
+            10, 5, 300, "DD", seed=3, tail_correction=True
+        )
+        cached = self.interaction.sim_single_cross(10, 5, 300, "DD", seed=3)
+        np.testing.assert_allclose(
+            corrected - cached, self.interaction.tail_estimate["mean"]
+        )
+
+    def test_sweep_matches_single_simulations(self):
+        swept = self.interaction.sweep(8, [2.5, 10], 300, "DQ", seed=9)
+        self.assertListEqual(list(swept), [2.5, 10])
+        shutil.rmtree(self.tmpdir)
+        os.makedirs(self.tmpdir)
+        for concentration in (2.5, 10):
+            single = self.interaction.sim_single_cross(
+                8, concentration, 300, "DQ", seed=9
+            )
+            np.testing.assert_array_equal(swept[concentration], single)
+
+    def test_sweep_uses_common_random_numbers(self):
+        # every site doped at 2.5% is also doped at 10%, so r_i can only grow
+        swept = self.interaction.sweep(8, [2.5, 10], 300, "DQ", seed=9)
+        self.assertTrue(np.all(swept[10] >= swept[2.5]))
+
+    def test_sweep_reuses_cached_concentrations(self):
+        cached = self.interaction.sim_single_cross(8, 5, 300, "DQ", seed=9)
+        with unittest.mock.patch.object(
+            pyet_utils, "cache_writer", wraps=pyet_utils.cache_writer
+        ) as writer:
+            swept = self.interaction.sweep(8, [5, 10], 300, "DQ", seed=9)
+        self.assertEqual(writer.call_count, 1)
+        np.testing.assert_array_equal(swept[5], cached)
+
+    def test_unseeded_sweep_does_not_mix_cached_runs(self):
+        self.interaction.sim_single_cross(8, 5, 300, "DQ")
+        with unittest.mock.patch.object(
+            pyet_utils, "cache_reader", side_effect=AssertionError
+        ):
+            swept = self.interaction.sweep(8, [5, 10], 300, "DQ")
+        self.assertTrue(np.all(swept[10] >= swept[5]))
+
+    def test_unseeded_multipole_does_not_mix_cached_runs(self):
+        self.interaction.sim_single_cross(8, 10, 300, "DD")
+        with unittest.mock.patch.object(
+            pyet_utils, "cache_reader", side_effect=AssertionError
+        ):
+            components = self.interaction.sim_multipole(8, 10, 300)
+        # the same sites are doped for every interaction type
+        np.testing.assert_array_equal(components["DD"] == 0, components["QQ"] == 0)
+
+    def test_shell_model_matches_monte_carlo(self):
+        shells = self.interaction.shell_model(12, 5, "DQ")
+        self.assertEqual(
+            shells.multiplicity.sum(), len(self.interaction.filtered_coords)
+        )
+        r_i = self.interaction.sim_single_cross(12, 5, 20000, "DQ", seed=11)
+        u = np.array([0.5, 2.0, 10.0, 50.0])
+        samples = np.exp(-np.outer(u, r_i))
+        stderr = samples.std(axis=1) / np.sqrt(len(r_i))
+        np.testing.assert_array_less(
+            np.abs(shells.laplace(u) - samples.mean(axis=1)), 5 * stderr + 1e-12
+        )
+
+    def test_unknown_engine_raises(self):
+        with self.assertRaises(ValueError):
+            self.interaction.sim_single_cross(8, 10, 10, "DQ", engine="gpu")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,21 +1,36 @@
 """Tests for pyet_mc.pyet_utils — Trace class and utility functions."""
 
+import collections
 import json
 import os
 import shutil
+import socket
+import subprocess
+import sys
 import tempfile
+import threading
+import time
 import unittest
+import unittest.mock
 
 import numpy as np
 import pandas as pd
 
+from pyet_mc import pyet_utils
 from pyet_mc.pyet_utils import (
     Gamma2sigma,
+    LaplaceSurrogate,
+    RunningStats,
+    ShellDistribution,
     Trace,
     cache_clear,
+    cache_key,
     cache_list,
+    cache_prune,
+    cache_stats,
     cache_reader,
     cache_writer,
+    compress_radial_data,
     name_checker,
 )
 
@@ -85,6 +100,124 @@ class TestTrace(unittest.TestCase):
             np.testing.assert_almost_equal(t.trace[i], expected, decimal=10)
 
 
+class TestShellDistribution(unittest.TestCase):
+    """Tests for the analytic shell model distribution."""
+
+    def setUp(self):
+        self.shells = ShellDistribution(
+            radii=np.array([4.0, 5.0]),
+            multiplicity=np.array([2, 3]),
+            weights=np.array([1.0, 0.25]),
+            concentration=20,
+        )
+
+    def test_laplace_matches_enumeration(self):
+        """laplace() must equal the average over every doping configuration."""
+        import itertools
+
+        weights = np.repeat(self.shells.weights, [2, 3])
+        u = np.array([0.0, 0.1, 1.0, 10.0])
+        expected = np.zeros_like(u)
+        for occupied in itertools.product([0, 1], repeat=len(weights)):
+            occupied = np.array(occupied)
+            probability = np.prod(np.where(occupied, 0.2, 0.8))
+            expected += probability * np.exp(-u * np.dot(occupied, weights))
+        np.testing.assert_allclose(self.shells.laplace(u), expected)
+
+    def test_mean(self):
+        self.assertAlmostEqual(self.shells.mean(), 0.2 * (2 * 1.0 + 3 * 0.25))
+
+    def test_laplace_at_zero_is_one(self):
+        self.assertAlmostEqual(float(self.shells.laplace(0.0)), 1.0)
+
+
+class TestCompressRadialData(unittest.TestCase):
+    """Tests for the log-binned compression of interaction components."""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.r_i = rng.binomial(1, 0.1, (5000, 40)) @ rng.uniform(0, 1, 40) ** 6
+
+    def test_error_within_tolerance(self):
+        for tolerance in (1e-3, 1e-5):
+            compressed = compress_radial_data(self.r_i, tolerance)
+            self.assertLessEqual(compressed.error, tolerance)
+            u = np.logspace(-2, 3, 40) / self.r_i.mean()
+            exact = np.array([np.exp(-x * self.r_i).mean() for x in u])
+            np.testing.assert_allclose(compressed.laplace(u), exact, atol=tolerance)
+
+    def test_preserves_mean_and_zeros(self):
+        compressed = compress_radial_data(self.r_i)
+        self.assertAlmostEqual(compressed.mean(), self.r_i.mean())
+        self.assertAlmostEqual(compressed.weights.sum(), 1.0)
+        self.assertEqual(compressed.nodes[0], 0.0)
+        self.assertAlmostEqual(compressed.weights[0], np.mean(self.r_i == 0))
+
+    def test_negative_components_raise(self):
+        with self.assertRaises(ValueError):
+            compress_radial_data(np.array([1.0, -0.5]))
+
+
+class TestLaplaceSurrogate(unittest.TestCase):
+    """Tests for the tabulated G(u) surrogate."""
+
+    def test_within_tolerance_of_exact(self):
+        rng = np.random.default_rng(2)
+        r_i = rng.binomial(1, 0.05, (2000, 50)) @ rng.uniform(0, 1, 50) ** 6
+        surrogate = LaplaceSurrogate(r_i, tolerance=1e-6)
+        u = np.concatenate([[0], np.logspace(-8, 6, 500) / r_i.mean()])
+        exact = np.array([np.exp(-x * r_i).mean() for x in u])
+        np.testing.assert_allclose(surrogate.laplace(u), exact, atol=1e-6)
+
+    def test_accepts_shell_distribution(self):
+        shells = ShellDistribution([4.0, 5.0], [6, 8], [1.0, 0.3], 5)
+        surrogate = LaplaceSurrogate(shells)
+        u = np.logspace(-3, 3, 100)
+        np.testing.assert_allclose(surrogate.laplace(u), shells.laplace(u), atol=1e-5)
+        self.assertEqual(float(surrogate.laplace(0.0)), 1.0)
+
+    def test_unreachable_tolerance_stops_with_warning(self):
+        r_i = np.random.default_rng(4).uniform(0, 2, 500)
+        with self.assertWarns(RuntimeWarning):
+            surrogate = LaplaceSurrogate(r_i, tolerance=1e-20, max_points=500)
+        self.assertLessEqual(len(surrogate), 500)
+        self.assertGreater(surrogate.error, 1e-20)
+        u = np.linspace(0, 50, 5000)
+        measured = np.abs(surrogate.laplace(u) - np.exp(-np.outer(u, r_i)).mean(axis=1))
+        self.assertLessEqual(measured.max(), surrogate.error)
+
+    def test_error_is_a_bound_on_multiscale_data(self):
+        rng = np.random.default_rng(0)
+        r_i = np.concatenate([rng.lognormal(0, 3, 5000), np.zeros(500)])
+        surrogate = LaplaceSurrogate(r_i, tolerance=1e-5)
+        self.assertLessEqual(surrogate.error, 1e-5)
+        # dense near every scale of r_i, and far beyond the grid
+        u = np.concatenate([np.logspace(-9, 9, 20000), surrogate.u[1:8] / 2])
+        measured = np.abs(surrogate.laplace(u) - pyet_utils._empirical_laplace(r_i, u))
+        self.assertLessEqual(measured.max(), surrogate.error)
+
+
+class TestRunningStats(unittest.TestCase):
+    """Tests for the blockwise running statistics."""
+
+    def test_blocks_match_full_statistics(self):
+        values = np.random.default_rng(0).random(1000) * 5
+        stats = RunningStats(np.linspace(0, 5, 11))
+        for block in np.array_split(values, [1, 250, 600]):
+            stats.update(block)
+        self.assertEqual(stats.count, 1000)
+        self.assertAlmostEqual(stats.mean, values.mean())
+        self.assertAlmostEqual(stats.variance, values.var(ddof=1))
+        np.testing.assert_array_equal(
+            stats.histogram, np.histogram(values, np.linspace(0, 5, 11))[0]
+        )
+
+    def test_variance_undefined_before_two_values(self):
+        stats = RunningStats(np.linspace(0, 1, 3))
+        stats.update(np.array([0.5]))
+        self.assertTrue(np.isnan(stats.variance))
+
+
 class TestGamma2sigma(unittest.TestCase):
     """Tests for the Gamma2sigma helper."""
 
@@ -128,6 +261,437 @@ class TestNameChecker(unittest.TestCase):
         self.assertIn("1-fitlog.pyet", result)
 
 
+class TestBinaryCache(unittest.TestCase):
+    """Tests for the .npy cache payloads and the migration of legacy entries."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        patcher = unittest.mock.patch.object(pyet_utils, "cache_dir", self.tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.params = dict(
+            process="singlecross",
+            radius=10,
+            concentration=2.5,
+            iterations=4,
+            interaction_type="DQ",
+            intrinsic=False,
+        )
+
+    def test_payload_is_binary_and_memory_mapped(self):
+        cache_writer(np.arange(4.0), sourcefile="a.cif", **self.params)
+        files = sorted(f for f in os.listdir(self.tmpdir) if f != "index.sqlite")
+        self.assertEqual([os.path.splitext(f)[1] for f in files], [".json", ".npy"])
+        with open(os.path.join(self.tmpdir, files[0])) as f:
+            self.assertNotIn("r_components", json.load(f))
+        result = cache_reader(sourcefile="a.cif", **self.params)
+        self.assertIsInstance(result, np.memmap)
+        self.assertFalse(result.flags.writeable)
+        np.testing.assert_array_equal(result, np.arange(4.0))
+
+    def test_legacy_entry_is_migrated(self):
+        legacy = self.params | {
+            "sourcefile": "a.cif",
+            "date": "2024-08-27T08:04:49",
+            "r_components": [0.5, 1.5, 2.5, 3.5],
+        }
+        name = "singlecross_10_2pt5_DQ_4_intrinsic_False_20240827080449"
+        with open(os.path.join(self.tmpdir, f"{name}.json"), "w") as f:
+            json.dump(legacy, f)
+        first = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(first, [0.5, 1.5, 2.5, 3.5])
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, f"{name}.npy")))
+        with open(os.path.join(self.tmpdir, f"{name}.json")) as f:
+            sidecar = json.load(f)
+        self.assertNotIn("r_components", sidecar)
+        self.assertEqual(sidecar["date"], "2024-08-27T08:04:49")
+        second = cache_reader(sourcefile="a.cif", **self.params)
+        self.assertIsInstance(second, np.memmap)
+        np.testing.assert_array_equal(second, first)
+
+    def test_key_lookup_ignores_source_file_name(self):
+        key = cache_key(cif="abc", radius=10.0)
+        cache_writer(np.arange(4.0), sourcefile="a.cif", key=key, **self.params)
+        result = cache_reader(sourcefile="renamed.cif", key=key, **self.params)
+        np.testing.assert_array_equal(result, np.arange(4.0))
+        other = cache_key(cif="abd", radius=10.0)
+        self.assertIsNone(cache_reader(sourcefile="a.cif", key=other, **self.params))
+
+    def test_cache_key_is_canonical(self):
+        self.assertEqual(
+            cache_key(cif="abc", radius=10.0, s=8.0),
+            cache_key(s=8.0, radius=10.0, cif="abc"),
+        )
+        self.assertNotEqual(
+            cache_key(cif="abc", radius=10.0), cache_key(cif="abc", radius=10.5)
+        )
+
+    def test_clear_removes_payload(self):
+        cache_writer(np.arange(4.0), sourcefile="a.cif", **self.params)
+        with unittest.mock.patch("builtins.input", return_value="y"):
+            cache_clear(0)
+        self.assertListEqual(os.listdir(self.tmpdir), ["index.sqlite"])
+        self.assertIsNone(cache_reader(sourcefile="a.cif", **self.params))
+
+    def test_index_is_rebuilt_when_missing(self):
+        cache_writer(np.arange(4.0), sourcefile="a.cif", **self.params)
+        os.remove(os.path.join(self.tmpdir, "index.sqlite"))
+        result = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(result, np.arange(4.0))
+
+    def test_lookup_does_not_open_sidecars(self):
+        cache_writer(np.arange(4.0), sourcefile="a.cif", **self.params)
+        with unittest.mock.patch.object(json, "load", side_effect=AssertionError):
+            result = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(result, np.arange(4.0))
+
+
+class TestCacheManagement(unittest.TestCase):
+    """Tests for non-interactive eviction and cache statistics."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        for name, value in (("cache_dir", self.tmpdir), ("cache_max_bytes", None)):
+            patcher = unittest.mock.patch.object(pyet_utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        cache_stats(reset=True)
+
+    def write(self, concentration):
+        cache_writer(
+            np.zeros(1000),
+            sourcefile="a.cif",
+            process="singlecross",
+            radius=10,
+            concentration=concentration,
+            iterations=1000,
+            interaction_type="DQ",
+            intrinsic=False,
+        )
+
+    def read(self, concentration):
+        return cache_reader(
+            sourcefile="a.cif",
+            process="singlecross",
+            radius=10,
+            concentration=concentration,
+            iterations=1000,
+            interaction_type="DQ",
+            intrinsic=False,
+        )
+
+    def test_prune_evicts_least_recently_used(self):
+        for concentration in (1, 2, 3):
+            self.write(concentration)
+        self.read(1)
+        entry = cache_stats()["bytes"] // 3
+        removed = cache_prune(max_bytes=2 * entry)
+        self.assertEqual(removed["entries"], 1)
+        self.assertIsNotNone(self.read(1))
+        self.assertIsNone(self.read(2))
+        self.assertIsNotNone(self.read(3))
+
+    def test_prune_by_age(self):
+        self.write(1)
+        self.assertEqual(cache_prune(max_age=3600)["entries"], 0)
+        self.assertEqual(cache_prune(max_age=0)["entries"], 1)
+        self.assertEqual(cache_stats()["entries"], 0)
+
+    def test_limit_is_enforced_on_write(self):
+        self.write(1)
+        entry = cache_stats()["bytes"]
+        pyet_utils.set_cache_limit(entry)
+        self.write(2)
+        self.assertIsNone(self.read(1))
+        self.assertIsNotNone(self.read(2))
+
+    def test_stats_count_hits_and_misses(self):
+        self.write(1)
+        self.read(1)
+        self.read(2)
+        stats = cache_stats(reset=True)
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["entries"], 1)
+        self.assertGreater(stats["bytes_read"], 8000)
+        self.assertEqual(stats["bytes_written"], stats["bytes"])
+        self.assertEqual(cache_stats()["hits"], 0)
+
+    def test_reads_do_not_create_missing_directory(self):
+        missing = os.path.join(self.tmpdir, "missing")
+        with unittest.mock.patch.object(pyet_utils, "cache_dir", missing):
+            self.assertIsNone(self.read(1))
+            self.assertEqual(cache_stats()["entries"], 0)
+            self.assertEqual(cache_prune(max_age=0)["entries"], 0)
+        self.assertFalse(os.path.exists(missing))
+
+    def test_clear_without_cache_directory(self):
+        missing = os.path.join(self.tmpdir, "missing")
+        with unittest.mock.patch.object(pyet_utils, "cache_dir", missing):
+            cache_clear(confirm=False)
+            cache_clear(0, confirm=False)
+        self.assertFalse(os.path.exists(missing))
+
+    def test_read_only_directory_is_not_written(self):
+        self.write(1)
+        os.remove(os.path.join(self.tmpdir, pyet_utils._INDEX_NAME))
+        with unittest.mock.patch.object(pyet_utils.os, "access", return_value=False):
+            self.assertIsNotNone(self.read(1))
+            self.assertEqual(cache_stats()["entries"], 1)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.tmpdir, pyet_utils._INDEX_NAME))
+        )
+
+    def test_prune_keeps_entries_in_use(self):
+        self.write(1)
+        self.write(2)
+        real_remove = os.remove
+
+        def remove(path):
+            if os.path.basename(path).startswith("singlecross_10_1_"):
+                raise PermissionError("in use")
+            real_remove(path)
+
+        with unittest.mock.patch.object(pyet_utils.os, "remove", side_effect=remove):
+            removed = cache_prune(max_age=0)
+        self.assertEqual(removed["entries"], 1)
+        self.assertEqual(cache_stats()["entries"], 1)
+        self.assertIsNotNone(self.read(1))
+        self.assertIsNone(self.read(2))
+
+    def test_clear_without_confirmation(self):
+        self.write(1)
+        with unittest.mock.patch("builtins.input", side_effect=AssertionError):
+            cache_clear(confirm=False)
+        self.assertEqual(cache_stats()["entries"], 0)
+
+
+class TestCacheTiers(unittest.TestCase):
+    """Tests for the configurable cache location and shared cache directories."""
+
+    params = dict(
+        process="singlecross",
+        radius=10,
+        concentration=2.5,
+        iterations=100,
+        interaction_type="DQ",
+        intrinsic=False,
+    )
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.local = os.path.join(self.tmpdir, "local")
+        self.shared = os.path.join(self.tmpdir, "shared")
+        for name, value in (
+            ("cache_dir", self.shared),
+            ("cache_shared_dirs", []),
+            ("cache_max_bytes", None),
+        ):
+            patcher = unittest.mock.patch.object(pyet_utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # populate the shared directory as its owner would
+        cache_writer(np.arange(100.0), sourcefile="a.cif", **self.params)
+        pyet_utils.set_cache_dir(self.local, shared=[self.shared])
+
+    def test_environment_variable(self):
+        with unittest.mock.patch.dict(os.environ, {"PYET_CACHE_DIR": self.local}):
+            self.assertEqual(pyet_utils._default_cache_dir(), self.local)
+
+    def test_local_directory_is_created_on_write(self):
+        pyet_utils.set_cache_dir(os.path.join(self.local, "nested"))
+        cache_writer(np.arange(3.0), sourcefile="a.cif", **self.params)
+        result = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(result, np.arange(3.0))
+
+    def test_promoted_entry_is_evicted_from_memory_with_local_copy(self):
+        with unittest.mock.patch.object(
+            pyet_utils, "_memory_cache", collections.OrderedDict()
+        ):
+            first = cache_reader(sourcefile="a.cif", **self.params)
+            self.assertEqual(cache_prune(max_bytes=0)["entries"], 1)
+            self.assertEqual(cache_stats()["memory_entries"], 0)
+            second = cache_reader(sourcefile="a.cif", **self.params)
+        self.assertIsNot(first, second)
+        self.assertEqual(os.path.dirname(second.filename), self.local)
+
+    def test_shared_entry_is_promoted(self):
+        result = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(result, np.arange(100.0))
+        self.assertEqual(
+            sorted(os.listdir(self.local)),
+            sorted(os.listdir(self.shared)),
+        )
+        with unittest.mock.patch.object(
+            pyet_utils, "_promote_entry", side_effect=AssertionError
+        ):
+            result = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(result, np.arange(100.0))
+
+    def test_shared_directory_without_index(self):
+        os.remove(os.path.join(self.shared, pyet_utils._INDEX_NAME))
+        result = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(result, np.arange(100.0))
+        self.assertNotIn(pyet_utils._INDEX_NAME, os.listdir(self.shared))
+
+    def test_shared_entry_is_read_if_it_cannot_be_copied(self):
+        with unittest.mock.patch.object(
+            pyet_utils, "_atomic_write", side_effect=OSError("disk full")
+        ):
+            result = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(result, np.arange(100.0))
+
+    def test_local_entries_take_precedence(self):
+        cache_writer(np.ones(100), sourcefile="a.cif", **self.params)
+        result = cache_reader(sourcefile="a.cif", **self.params)
+        np.testing.assert_array_equal(result, np.ones(100))
+
+
+class TestMemoryCache(unittest.TestCase):
+    """Tests for the in-memory cache in front of the disk cache."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        for name, value in (
+            ("cache_dir", self.tmpdir),
+            ("cache_max_bytes", None),
+            ("memory_cache_max_bytes", 1024**2),
+            ("_memory_cache", collections.OrderedDict()),
+        ):
+            patcher = unittest.mock.patch.object(pyet_utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        cache_stats(reset=True)
+        for concentration in (1, 2):
+            cache_writer(
+                np.arange(1000.0),
+                sourcefile="a.cif",
+                **self.params(concentration),
+            )
+
+    def params(self, concentration, iterations=1000):
+        return dict(
+            process="singlecross",
+            radius=10,
+            concentration=concentration,
+            iterations=iterations,
+            interaction_type="DQ",
+            intrinsic=False,
+        )
+
+    def test_repeat_read_returns_same_array(self):
+        first = cache_reader(sourcefile="a.cif", **self.params(1))
+        with unittest.mock.patch.object(
+            pyet_utils, "_find_entry", side_effect=AssertionError
+        ):
+            second = cache_reader(sourcefile="a.cif", **self.params(1))
+        self.assertIs(first, second)
+        self.assertFalse(second.flags.writeable)
+        stats = cache_stats()
+        self.assertEqual((stats["hits"], stats["memory_hits"]), (2, 1))
+        self.assertEqual(stats["memory_bytes"], 8000)
+
+    def test_prefix_requests_are_held_separately(self):
+        full = cache_reader(sourcefile="a.cif", **self.params(1))
+        prefix = cache_reader(sourcefile="a.cif", **self.params(1, 10))
+        self.assertEqual(len(prefix), 10)
+        self.assertEqual(len(full), 1000)
+        self.assertEqual(cache_stats()["memory_entries"], 2)
+
+    def test_deleted_entries_are_not_served(self):
+        cache_reader(sourcefile="a.cif", **self.params(1))
+        cache_clear(confirm=False)
+        self.assertIsNone(cache_reader(sourcefile="a.cif", **self.params(1)))
+
+    def test_removed_entries_are_evicted_from_memory(self):
+        cache_reader(sourcefile="a.cif", **self.params(1))
+        cache_reader(sourcefile="a.cif", **self.params(2))
+        self.assertEqual(cache_prune(max_age=0)["entries"], 2)
+        self.assertEqual(cache_stats()["memory_entries"], 0)
+        cache_writer(np.arange(1000.0), sourcefile="a.cif", **self.params(1))
+        cache_reader(sourcefile="a.cif", **self.params(1))
+        cache_clear(confirm=False)
+        self.assertEqual(cache_stats()["memory_entries"], 0)
+
+    def test_least_recently_used_array_is_evicted(self):
+        pyet_utils.set_memory_cache_limit(8000)
+        cache_reader(sourcefile="a.cif", **self.params(1))
+        cache_reader(sourcefile="a.cif", **self.params(2))
+        cache_reader(sourcefile="a.cif", **self.params(1))
+        stats = cache_stats()
+        self.assertEqual((stats["memory_hits"], stats["memory_entries"]), (0, 1))
+
+    def test_disabled(self):
+        pyet_utils.set_memory_cache_limit(0)
+        first = cache_reader(sourcefile="a.cif", **self.params(1))
+        second = cache_reader(sourcefile="a.cif", **self.params(1))
+        self.assertIsNot(first, second)
+        self.assertEqual(cache_stats()["memory_entries"], 0)
+
+
+class TestCacheLock(unittest.TestCase):
+    """Tests for the in-progress lock on cache entries."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        patcher = unittest.mock.patch.object(pyet_utils, "cache_dir", self.tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def test_lock_is_released(self):
+        with pyet_utils.cache_lock("abc", seed=1) as waited:
+            self.assertFalse(waited)
+            self.assertEqual(len(os.listdir(self.tmpdir)), 1)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_waits_for_holder(self):
+        events = []
+
+        def hold():
+            with pyet_utils.cache_lock("abc"):
+                started.set()
+                time.sleep(0.3)
+                events.append("released")
+
+        started = threading.Event()
+        holder = threading.Thread(target=hold)
+        holder.start()
+        started.wait()
+        with pyet_utils.cache_lock("abc", poll=0.01) as waited:
+            events.append("acquired")
+        holder.join()
+        self.assertTrue(waited)
+        self.assertEqual(events, ["released", "acquired"])
+
+    def test_different_entries_do_not_wait(self):
+        with pyet_utils.cache_lock("abc", seed=1):
+            with pyet_utils.cache_lock("abc", seed=2, timeout=0) as waited:
+                self.assertFalse(waited)
+
+    def test_times_out(self):
+        with pyet_utils.cache_lock("abc"):
+            start = time.monotonic()
+            with pyet_utils.cache_lock("abc", timeout=0.1, poll=0.01) as waited:
+                self.assertTrue(waited)
+            self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    @unittest.skipUnless(os.name == "posix", "stale locks are detected by pid")
+    def test_stale_lock_is_removed(self):
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        with pyet_utils.cache_lock("abc"):
+            (lock,) = os.listdir(self.tmpdir)
+        with open(os.path.join(self.tmpdir, lock), "w") as lock_file:
+            json.dump({"pid": process.pid, "host": socket.gethostname()}, lock_file)
+        with pyet_utils.cache_lock("abc", timeout=0) as waited:
+            self.assertFalse(waited)
+
+
 class TestCacheRoundTrip(unittest.TestCase):
     """Tests for cache_writer and cache_reader."""
 
@@ -37,6 +37,12 @@ class TestStructureValidation(unittest.TestCase):
             Structure(bad_path)
         self.assertIn(bad_path, str(ctx.exception))
 
+    def test_init_unknown_neighbour_engine_raises_value_error(self):
+        """An unrecognised neighbour engine must raise ValueError."""
+        with self.assertRaises(ValueError) as ctx:
+            Structure(_cif_path(), neighbour_engine="kdtree")
+        self.assertIn("neighbour engine", str(ctx.exception))
+
     def test_init_valid_cif(self):
         """Structure() with a valid CIF file should succeed."""
         cif_file = _cif_path()